@@ -17,10 +17,13 @@ import json
 import argparse
 from dateutil.parser import parse
 from dateutil.relativedelta import relativedelta
-import csv
 import re
 import sys
 
+# Line ending the CSV reports have always been written with (the csv
+# module's default), kept so existing consumers see identical files
+CSV_LINE_TERMINATOR = '\r\n'
+
 class BitbucketContributionTracker:
     def __init__(self, base_url, token):
         """Initialize the tracker with Bitbucket credentials.
@@ -451,22 +454,17 @@ class BitbucketContributionTracker:
             prs (list): List of PR data
             filename (str): Output filename
         """
-        with open(filename, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['PR Number', 'Title', 'Author', 'Email', 
-                           'Associated Commits', 'Additions', 'Deletions', 'Total Changes'])
-            
-            for pr in prs:
-                writer.writerow([
-                    pr['pr_number'],
-                    pr['pr_title'],
-                    pr['author_name'],
-                    pr['author_email'],
-                    len(pr['associated_commits']),
-                    pr['total_additions'],
-                    pr['total_deletions'],
-                    pr['total_additions'] + pr['total_deletions']
-                ])
+        df = pd.DataFrame({
+            'PR Number': [pr['pr_number'] for pr in prs],
+            'Title': [pr['pr_title'] for pr in prs],
+            'Author': [pr['author_name'] for pr in prs],
+            'Email': [pr['author_email'] for pr in prs],
+            'Associated Commits': [len(pr['associated_commits']) for pr in prs],
+            'Additions': [pr['total_additions'] for pr in prs],
+            'Deletions': [pr['total_deletions'] for pr in prs]
+        })
+        df['Total Changes'] = df['Additions'] + df['Deletions']
+        df.to_csv(filename, index=False, lineterminator=CSV_LINE_TERMINATOR)
     
     def save_direct_commits(self, commits, filename):
         """
@@ -494,19 +492,16 @@ class BitbucketContributionTracker:
             commits_by_date[date_str]['deletions'] += commit['deletions']
         
         # Write to CSV
-        with open(filename, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Date', 'Authors', 'Commit Count', 'Additions', 'Deletions', 'Total Changes'])
-            
-            for date_str, data in sorted(commits_by_date.items()):
-                writer.writerow([
-                    date_str,
-                    ', '.join(data['authors']),
-                    data['count'],
-                    data['additions'],
-                    data['deletions'],
-                    data['additions'] + data['deletions']
-                ])
+        dates = sorted(commits_by_date)
+        df = pd.DataFrame({
+            'Date': dates,
+            'Authors': [', '.join(commits_by_date[date_str]['authors']) for date_str in dates],
+            'Commit Count': [commits_by_date[date_str]['count'] for date_str in dates],
+            'Additions': [commits_by_date[date_str]['additions'] for date_str in dates],
+            'Deletions': [commits_by_date[date_str]['deletions'] for date_str in dates]
+        })
+        df['Total Changes'] = df['Additions'] + df['Deletions']
+        df.to_csv(filename, index=False, lineterminator=CSV_LINE_TERMINATOR)
     
     def save_author_stats(self, author_stats, filename):
         """
@@ -516,29 +511,14 @@ class BitbucketContributionTracker:
             author_stats (dict): Author statistics data
             filename (str): Output filename
         """
-        with open(filename, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Name', 'Email', 'PRs', 'PR Commits', 'Direct Commits', 
-                           'Additions', 'Deletions', 'Total Changes'])
-            
-            # Sort by total changes descending
-            sorted_stats = sorted(
-                author_stats.values(), 
-                key=lambda x: x['total_changes'], 
-                reverse=True
-            )
-            
-            for stats in sorted_stats:
-                writer.writerow([
-                    stats['name'],
-                    stats['email'],
-                    stats['pr_count'],
-                    stats['pr_commits'],
-                    stats['direct_commits'],
-                    stats['additions'],
-                    stats['deletions'],
-                    stats['total_changes']
-                ])
+        columns = {'name': 'Name', 'email': 'Email', 'pr_count': 'PRs', 'pr_commits': 'PR Commits',
+                   'direct_commits': 'Direct Commits', 'additions': 'Additions', 'deletions': 'Deletions',
+                   'total_changes': 'Total Changes'}
+        df = pd.DataFrame(list(author_stats.values()), columns=list(columns)).rename(columns=columns)
+        
+        # Sort by total changes descending; stable, so ties keep their order
+        df = df.sort_values('Total Changes', ascending=False, kind='stable')
+        df.to_csv(filename, index=False, lineterminator=CSV_LINE_TERMINATOR)
     
     def visualize_author_contributions(self, author_stats, workspace, repo_slug):
         """
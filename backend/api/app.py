@@ -7,7 +7,9 @@ of concerns and enhanced multi-repository support.
 """
 
 from flask import Flask, request, jsonify, send_file
+from flask.json.provider import DefaultJSONProvider, JSONProvider
 from flask_cors import CORS
+import math
 import os
 import sys
 import threading
@@ -17,6 +19,12 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import logging
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Add project paths
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'core'))
@@ -27,8 +35,27 @@ from multi_repo_analyzer import MultiRepoAnalyzer
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson, which encodes datetimes and numpy values natively"""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+class ISODateJSONProvider(DefaultJSONProvider):
+    """Stdlib fallback that formats datetimes the same way orjson does"""
+    
+    @staticmethod
+    def default(obj):
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        return DefaultJSONProvider.default(obj)
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = ORJSONProvider(app) if HAS_ORJSON else ISODateJSONProvider(app)
 CORS(app)  # Enable CORS for frontend communication
 
 # Global storage for analysis status and results
@@ -36,9 +63,12 @@ analysis_jobs = {}
 job_lock = threading.Lock()
 
 # Configuration
-OUTPUT_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'output')
+OUTPUT_DIR = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'output'))
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Default wall-clock budget for a job (overridable per job via 'timeout_s')
+DEFAULT_JOB_TIMEOUT_S = 3600
+
 class AnalysisJob:
     """Class to track analysis job status and results"""
     
@@ -52,14 +82,46 @@ class AnalysisJob:
         self.end_time = None
         self.results = None
         self.error = None
-        self.generated_files = []
+        self.cancel_event = threading.Event()
+        self.deadline = time.monotonic() + float(config.get('timeout_s', DEFAULT_JOB_TIMEOUT_S))
+        self._version = 0
+        self._generated_files = []
+    
+    @property
+    def generated_files(self) -> List[str]:
+        """Files produced by the job"""
+        return self._generated_files
+    
+    @generated_files.setter
+    def generated_files(self, files: List[str]):
+        self._generated_files = files
+        self._version += 1
+    
+    @property
+    def etag(self) -> str:
+        """Weak ETag that changes whenever the status payload changes"""
+        return f'W/"{self.job_id}-{self._version}"'
+    
+    @property
+    def is_finished(self) -> bool:
+        """Whether the job has reached a terminal state"""
+        return self.status in ["completed", "failed", "cancelled"]
+    
+    def timed_out(self) -> bool:
+        """Whether the job has run past its deadline"""
+        return time.monotonic() > self.deadline
+    
+    def should_stop(self) -> bool:
+        """Whether the analysis should stop (cancelled by user or past deadline)"""
+        return self.cancel_event.is_set() or self.timed_out()
     
     def update_status(self, status: str, progress: int, message: str):
         """Update job status"""
+        self._version += 1
         self.status = status
         self.progress = progress
         self.message = message
-        if status in ["completed", "failed"]:
+        if self.is_finished:
             self.end_time = datetime.now()
         
         logger.info(f"Job {self.job_id}: {message} ({progress}%)")
@@ -71,8 +133,8 @@ class AnalysisJob:
             'status': self.status,
             'progress': self.progress,
             'message': self.message,
-            'start_time': self.start_time.isoformat(),
-            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
             'generated_files': self.generated_files,
             'error': self.error
         }
@@ -118,7 +180,8 @@ def run_analysis_job(job: AnalysisJob):
             token=config['token'],
             base_url=config['base_url'],
             workspace=config['workspace'],
-            output_dir=OUTPUT_DIR
+            output_dir=OUTPUT_DIR,
+            should_stop=job.should_stop
         )
         
         job.update_status("parsing", 20, "Parsing repository configurations...")
@@ -132,22 +195,40 @@ def run_analysis_job(job: AnalysisJob):
         
         job.update_status("analyzing", 30, f"Analyzing {len(repo_configs)} repositories...")
         
-        # Run analysis
+        def report_progress(stage: str, done: int, total: int, display_name: str):
+            if stage == 'fetched':
+                job.update_status("analyzing", 30 + int(40 * done / total),
+                                  f"Analyzed {done}/{total} repositories ({display_name})")
+            elif stage == 'exported':
+                job.update_status("analyzing", 70 + int(20 * done / total),
+                                  f"Rendered {done}/{total} repositories ({display_name})")
+            else:
+                job.update_status("finalizing", 90, "Finalizing results...")
+        
+        # The analyzer polls job.should_stop, so a cancel or deadline ends the
+        # fetch even while a Bitbucket call is hung
         results = analyzer.analyze_repositories(
-            repo_configs=repo_configs,
-            start_date=config['start_date'],
-            end_date=config['end_date'],
-            group_by=config.get('group_by', 'day'),
-            focus_user=config.get('focus_user')
+            repo_configs,
+            config['start_date'],
+            config['end_date'],
+            config.get('group_by', 'day'),
+            config.get('focus_user'),
+            progress=report_progress
         )
         
-        job.update_status("finalizing", 90, "Finalizing results...")
+        if job.cancel_event.is_set():
+            job.update_status("cancelled", job.progress, "Analysis cancelled by user")
+            return
+        if job.timed_out():
+            job.error = "Analysis failed: timeout"
+            job.update_status("failed", 0, job.error)
+            return
         
         # Get generated files
         generated_files = []
         if os.path.exists(OUTPUT_DIR):
             for filename in os.listdir(OUTPUT_DIR):
-                if filename.endswith(('.png', '.csv', '.md')):
+                if filename.endswith(('.png', '.csv', '.parquet', '.md')):
                     generated_files.append(filename)
         
         job.generated_files = generated_files
@@ -179,7 +260,7 @@ def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': datetime.now(),
         'version': '2.0.0'
     })
 
@@ -197,7 +278,8 @@ def start_analysis():
         "start_date": "2025-06-20",
         "end_date": "2025-06-26",
         "group_by": "day",
-        "focus_user": "user@example.com"
+        "focus_user": "user@example.com",
+        "timeout_s": 3600
     }
     """
     try:
@@ -215,6 +297,16 @@ def start_analysis():
                 'error': f'Missing required fields: {", ".join(missing_fields)}'
             }), 400
         
+        # The optional time budget must be a positive number of seconds
+        if 'timeout_s' in data:
+            try:
+                timeout_s = float(data['timeout_s'])
+            except (TypeError, ValueError):
+                timeout_s = math.nan
+            if isinstance(data['timeout_s'], bool) or not math.isfinite(timeout_s) or timeout_s <= 0:
+                return jsonify({'error': 'timeout_s must be a positive number of seconds'}), 400
+            data['timeout_s'] = timeout_s
+        
         # Generate job ID
         job_id = str(uuid.uuid4())
         
@@ -250,7 +342,35 @@ def get_job_status(job_id: str):
     if not job:
         return jsonify({'error': 'Job not found'}), 404
     
-    return jsonify(job.to_dict())
+    # Pollers resend the last ETag; skip serialization when nothing changed
+    etag = job.etag
+    if request.headers.get('If-None-Match') == etag:
+        return '', 304, {'ETag': etag}
+    
+    response = jsonify(job.to_dict())
+    response.headers['ETag'] = etag
+    return response
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id: str):
+    """Request cancellation of a running analysis job"""
+    
+    with job_lock:
+        job = analysis_jobs.get(job_id)
+    
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    if job.is_finished:
+        return jsonify({'error': f'Job already {job.status}'}), 400
+    
+    job.cancel_event.set()
+    
+    return jsonify({
+        'job_id': job_id,
+        'status': 'cancelling',
+        'message': 'Cancellation requested'
+    }), 202
 
 @app.route('/api/jobs', methods=['GET'])
 def list_jobs():
@@ -285,31 +405,31 @@ def get_job_results(job_id: str):
 def download_file(filename: str):
     """Download a generated file"""
     
-    file_path = os.path.join(OUTPUT_DIR, filename)
-    
-    if not os.path.exists(file_path):
-        return jsonify({'error': 'File not found'}), 404
+    file_path = os.path.realpath(os.path.join(OUTPUT_DIR, filename))
     
     # Security check - only allow files in output directory
     if not os.path.commonpath([OUTPUT_DIR, file_path]) == OUTPUT_DIR:
         return jsonify({'error': 'Access denied'}), 403
     
-    return send_file(file_path, as_attachment=True)
+    try:
+        return send_file(file_path, as_attachment=True)
+    except FileNotFoundError:
+        return jsonify({'error': 'File not found'}), 404
 
 @app.route('/api/files/<filename>/view', methods=['GET'])
 def view_file(filename: str):
     """View a generated file in browser"""
     
-    file_path = os.path.join(OUTPUT_DIR, filename)
-    
-    if not os.path.exists(file_path):
-        return jsonify({'error': 'File not found'}), 404
+    file_path = os.path.realpath(os.path.join(OUTPUT_DIR, filename))
     
     # Security check
     if not os.path.commonpath([OUTPUT_DIR, file_path]) == OUTPUT_DIR:
         return jsonify({'error': 'Access denied'}), 403
     
-    return send_file(file_path)
+    try:
+        return send_file(file_path)
+    except FileNotFoundError:
+        return jsonify({'error': 'File not found'}), 404
 
 @app.route('/api/repositories/parse', methods=['POST'])
 def parse_repositories():
@@ -407,7 +527,10 @@ if __name__ == '__main__':
     print("   POST /api/analyze - Start analysis")
     print("   GET  /api/jobs/<id>/status - Job status")
     print("   GET  /api/jobs/<id>/results - Job results")
+    print("   POST /api/jobs/<id>/cancel - Cancel job")
     print("   GET  /api/files/<filename> - Download file")
     print("   POST /api/test-connection - Test connection")
+    print("\n💡 For production use Gunicorn: see backend/api/wsgi.py")
     
-    app.run(debug=True, host='127.0.0.1', port=5001)
+    # Debug mode (reloader + debugger) is opt-in via FLASK_DEBUG=1
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='127.0.0.1', port=5001, threaded=True)
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+WSGI entrypoint for the Multi-Repository Bitbucket LOC Analyzer API
+
+Run with a threaded Gunicorn worker, for example:
+
+    gunicorn -k gthread --workers 1 --threads 16 --timeout 120 \
+        --chdir backend/api wsgi:application
+
+Analysis jobs live in process memory, so keep a single worker process and
+scale with threads; otherwise status polls may land on a worker that never
+saw the job.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(__file__))
+
+from app import app
+
+application = app
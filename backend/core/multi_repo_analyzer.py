@@ -6,28 +6,44 @@ Enhanced analyzer that properly handles multiple repositories with separate
 charts for each repository, clear repo identification, and improved structure.
 """
 
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
 from datetime import datetime
 import os
 import sys
-from typing import List, Dict, Tuple, Optional
+import concurrent.futures
+import functools
+import hashlib
+import json
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Callable, List, Dict, Tuple, Optional
 import logging
 
-# Configure matplotlib for server environment
-import matplotlib
-matplotlib.use('Agg')
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
 
 # Add project root to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
 try:
-    import seaborn as sns
-    HAS_SEABORN = True
-    sns.set_style("whitegrid")
+    import numexpr as ne
+    HAS_NUMEXPR = True
 except ImportError:
-    HAS_SEABORN = False
+    HAS_NUMEXPR = False
+
+try:
+    import pyarrow  # noqa: F401 - the Parquet engine behind DataFrame.to_parquet
+    from pyarrow import feather
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
 
 from bitbucket_loc_analyzer import BitbucketLOCAnalyzer
 
@@ -35,10 +51,93 @@ from bitbucket_loc_analyzer import BitbucketLOCAnalyzer
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Derived columns cached on the data frames for the charts; not written to CSV
+HELPER_COLUMNS = ['_weekday', '_isoweek', '_name_lower']
+
+WEEKDAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Upper bound on repositories fetched from Bitbucket concurrently
+MAX_FETCH_WORKERS = 8
+
+# How often the fetch loop wakes up to check should_stop while fetches run
+STOP_POLL_INTERVAL_S = 1.0
+
+# Report bodies and heatmap pivots cached by content, relative to the output directory
+REPORT_CACHE_DIR = '.cache'
+
+# Part of every cache key; bump it whenever the report templates or the
+# pivot layout change so entries rendered by older code are never served
+REPORT_CACHE_VERSION = 1
+
+# Most recently used cache entries kept; older ones are pruned after each write
+REPORT_CACHE_MAX_ENTRIES = 64
+
+# Below this many rows numexpr's dispatch overhead outweighs the fused pass
+# (same cut-off pandas uses for its numexpr path)
+NUMEXPR_MIN_ROWS = 10_000
+
+
+# Plotting libraries are imported on first render so that runs which never
+# draw a chart do not pay for loading them
+@functools.lru_cache(maxsize=None)
+def _pyplot():
+    """Import pyplot on first use, configured for a server environment"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+@functools.lru_cache(maxsize=None)
+def _seaborn():
+    """Import seaborn on first use; None when it is not installed"""
+    try:
+        import seaborn as sns
+    except ImportError:
+        return None
+    return sns
+
+
+def _export_repository_worker(output_dir: str, workspace: str, dpi: int,
+                              repo_result: Dict, focus_user: Optional[str] = None) -> str:
+    """Process-pool entry point that renders one repository's charts and CSVs"""
+    renderer = _worker_renderer(output_dir, workspace, dpi)
+    renderer.export_repository_result(repo_result, focus_user)
+    return repo_result['repo_slug']
+
+
+@functools.lru_cache(maxsize=None)
+def _worker_renderer(output_dir: str, workspace: str, dpi: int) -> 'MultiRepoAnalyzer':
+    """One renderer per worker process, so its figures are reused across repositories"""
+    return MultiRepoAnalyzer.renderer(output_dir, workspace, dpi)
+
+
+if HAS_NUMBA:
+    # Compiled once and cached on disk. The loop is serial: with prange two
+    # rows hitting the same (row, column) cell would race on the +=.
+    @njit(cache=True)
+    def _sum_by_group(row_codes, col_codes, values, n_rows, n_cols):
+        """Sum values into an n_rows x n_cols grid by their row and column codes"""
+        out = np.zeros((n_rows, n_cols), np.int32)
+        for i in range(values.size):
+            if col_codes[i] >= 0:
+                out[row_codes[i], col_codes[i]] += values[i]
+        return out
+else:
+    def _sum_by_group(row_codes, col_codes, values, n_rows, n_cols):
+        """Sum values into an n_rows x n_cols grid by their row and column codes"""
+        out = np.zeros((n_rows, n_cols), np.int32)
+        present = col_codes >= 0  # factorize marks missing keys with -1
+        np.add.at(out, (row_codes[present], col_codes[present]), values[present])
+        return out
+
+
 class MultiRepoAnalyzer:
     """Enhanced multi-repository analyzer with clear separation and organization"""
     
-    def __init__(self, token: str, base_url: str, workspace: str, output_dir: str = "output"):
+    def __init__(self, token: str, base_url: str, workspace: str, output_dir: str = "output",
+                 should_stop: Optional[Callable[[], bool]] = None, dpi: int = 150,
+                 reuse_figure: bool = True):
         """
         Initialize the multi-repository analyzer
         
@@ -47,19 +146,50 @@ class MultiRepoAnalyzer:
             base_url: Bitbucket server base URL
             workspace: Workspace/project key
             output_dir: Directory for output files
+            should_stop: Optional callback polled between repositories and API
+                pages; returning True abandons the remaining work
+            dpi: Resolution of the saved PNG charts
+            reuse_figure: Keep one figure per chart size and clear it between
+                charts and runs instead of building a new one every time
         """
-        self.analyzer = BitbucketLOCAnalyzer(token, base_url, workspace)
+        self.analyzer = BitbucketLOCAnalyzer(base_url=base_url, token=token)
+        self.analyzer.should_stop = should_stop
+        self.should_stop = should_stop or (lambda: False)
+        self._init_rendering(output_dir, workspace, dpi, reuse_figure)
+    
+    @classmethod
+    def renderer(cls, output_dir: str, workspace: str, dpi: int = 150,
+                 reuse_figure: bool = True) -> 'MultiRepoAnalyzer':
+        """
+        Build an instance that can only render charts and save data
+        
+        Used by worker processes, which have no Bitbucket credentials.
+        """
+        instance = cls.__new__(cls)
+        instance.analyzer = None
+        instance.should_stop = lambda: False
+        instance._init_rendering(output_dir, workspace, dpi, reuse_figure)
+        return instance
+    
+    def _init_rendering(self, output_dir: str, workspace: str, dpi: int, reuse_figure: bool = True):
+        """Set up output location, plotting style and the reusable figures"""
         self.output_dir = output_dir
         self.workspace = workspace
+        self.dpi = dpi
+        self.reuse_figure = reuse_figure
         
         # Ensure output directory exists
         os.makedirs(self.output_dir, exist_ok=True)
         
-        # Set up plotting style
-        self._setup_plotting_style()
+        # Agg-backed figures keyed by size are cleared and reused for every
+        # chart and every run, keeping rendering out of pyplot's global figure
+        # manager. The plotting style is applied before the first one is built.
+        self._figures: Dict[Tuple[float, float], 'Figure'] = {}
+        self._style_applied = False
         
     def _setup_plotting_style(self):
         """Configure matplotlib plotting style"""
+        plt = _pyplot()
         plt.style.use('default')
         
         # Set font and style preferences
@@ -76,12 +206,77 @@ class MultiRepoAnalyzer:
             'grid.alpha': 0.3
         })
     
+    def _new_figure(self, figsize: Tuple[float, float]) -> 'Figure':
+        """Return a cleared figure of the given size for the next chart"""
+        fig = self._figures.get(figsize)
+        if fig is not None:
+            fig.clear()
+            return fig
+        
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        
+        if not self._style_applied:
+            self._setup_plotting_style()
+            self._style_applied = True
+        
+        fig = Figure(figsize=figsize, layout='constrained')
+        FigureCanvasAgg(fig)
+        if self.reuse_figure:
+            self._figures[figsize] = fig
+        return fig
+    
+    def _save_figure(self, fig: 'Figure', filename: str, tight_bbox: bool = False):
+        """
+        Render the reusable figure to a PNG file
+        
+        The reusable figure uses constrained layout, which is solved during
+        the draw, so no separate tight_layout pass is needed. Gridspec
+        dashboards with legends anchored outside their axes pass
+        tight_bbox=True to keep the bounding-box crop. PNGs use fast zlib
+        compression since they are regenerated on every run.
+        """
+        bbox_inches = 'tight' if tight_bbox else None
+        fig.savefig(filename, dpi=self.dpi, bbox_inches=bbox_inches, facecolor='white',
+                    pil_kwargs={'compress_level': 1, 'optimize': False})
+    
+    @staticmethod
+    def _truncate(s: pd.Series, n: int) -> pd.Series:
+        """Shorten labels longer than n characters, appending '...'"""
+        s = s.astype(str)
+        return s.mask(s.str.len() > n, s.str.slice(0, n) + '...')
+    
+    @staticmethod
+    def _total_changes(user_data: pd.DataFrame) -> pd.Series:
+        """Per-user total changes, summing additions and deletions when the column is missing"""
+        if 'total_changes' in user_data.columns:
+            return user_data['total_changes']
+        zeros = pd.Series(0, index=user_data.index)
+        return user_data.get('additions', zeros).add(user_data.get('deletions', zeros), fill_value=0)
+    
+    def _apply_date_axis(self, ax, n_dates: Optional[int] = None):
+        """
+        Format a date x-axis as MM-DD with rotated tick labels
+        
+        Args:
+            ax: Axes whose x-axis holds dates
+            n_dates: Number of plotted dates; when given, ticks are thinned
+                to roughly eight labels
+        """
+        import matplotlib.dates as mdates
+        
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d'))
+        if n_dates:
+            ax.xaxis.set_major_locator(mdates.DayLocator(interval=max(1, n_dates // 8)))
+        ax.tick_params(axis='x', rotation=45)
+    
     def analyze_repositories(self, 
                            repo_configs: List[Dict],
                            start_date: str, 
                            end_date: str, 
                            group_by: str = 'day',
-                           focus_user: Optional[str] = None) -> Dict:
+                           focus_user: Optional[str] = None,
+                           progress: Optional[Callable[[str, int, int, str], None]] = None) -> Dict:
         """
         Analyze multiple repositories with enhanced configuration
         
@@ -91,71 +286,223 @@ class MultiRepoAnalyzer:
             end_date: End date in YYYY-MM-DD format
             group_by: Grouping period ('day', 'week', 'month')
             focus_user: Optional user to focus analysis on
+            progress: Optional callback called as progress(stage, done, total,
+                display_name): with stage 'fetched' or 'exported' as each
+                repository finishes that stage, and once with 'finalizing'
+                before the combined analysis
             
         Returns:
-            Dictionary containing analysis results for each repository
+            Dictionary containing analysis results for each repository. When
+            should_stop turns True the repositories fetched so far are
+            returned without charts or a report.
         """
-        results = {}
-        successful_repos = []
-        
         logger.info(f"🔍 Starting analysis of {len(repo_configs)} repositories...")
+        progress = progress or (lambda stage, done, total, display_name: None)
         
-        for i, repo_config in enumerate(repo_configs, 1):
-            repo_slug = repo_config['slug']
-            display_name = repo_config.get('display_name', repo_slug)
-            
-            logger.info(f"📊 [{i}/{len(repo_configs)}] Analyzing: {display_name} ({repo_slug})")
+        # Stage 1: fetch repositories concurrently (network bound)
+        fetched = self._fetch_repositories(repo_configs, start_date, end_date, group_by, focus_user, progress)
+        results = {rc['slug']: fetched[rc['slug']] for rc in repo_configs if rc['slug'] in fetched}
+        if self.should_stop():
+            logger.warning(f"⏹️ Analysis stopped after fetching {len(results)} repositories")
+            return results
+        
+        # Stage 2: render charts and CSVs in worker processes (CPU bound)
+        self._export_repositories(results, focus_user, progress)
+        
+        progress('finalizing', len(results), len(results), '')
+        self.finalize_analysis(results, focus_user)
+        
+        logger.info(f"🎉 Analysis complete! Processed {len(results)} repositories successfully")
+        return results
+    
+    def _fetch_repositories(self,
+                            repo_configs: List[Dict],
+                            start_date: str,
+                            end_date: str,
+                            group_by: str,
+                            focus_user: Optional[str],
+                            progress: Callable[[str, int, int, str], None]) -> Dict:
+        """Run analyze_single_repo for every repository on a thread pool"""
+        fetched = {}
+        total = len(repo_configs)
+        if not total:
+            return fetched
+        
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, total))
+        try:
+            futures = {
+                executor.submit(self.analyze_single_repo, repo_config,
+                                start_date, end_date, group_by, focus_user): repo_config
+                for repo_config in repo_configs
+            }
+            pending = set(futures)
+            done = 0
             
-            try:
-                # Analyze individual repository
-                daily_data, user_data = self.analyzer.analyze_repository(
-                    repo_slug, start_date, end_date, group_by, focus_user
+            # Wake up periodically so a stop request is noticed even while a
+            # Bitbucket call is hung
+            while pending and not self.should_stop():
+                finished, pending = concurrent.futures.wait(
+                    pending, timeout=STOP_POLL_INTERVAL_S,
+                    return_when=concurrent.futures.FIRST_COMPLETED
                 )
                 
-                if daily_data.empty or user_data.empty:
-                    logger.warning(f"⚠️ No data found for repository: {display_name}")
-                    continue
-                
-                # Store results with enhanced metadata
-                results[repo_slug] = {
-                    'daily_data': daily_data,
-                    'user_data': user_data,
-                    'repo_slug': repo_slug,
-                    'display_name': display_name,
-                    'analysis_meta': {
-                        'start_date': start_date,
-                        'end_date': end_date,
-                        'group_by': group_by,
-                        'focus_user': focus_user,
-                        'total_commits': daily_data['commits'].sum() if 'commits' in daily_data.columns else 0,
-                        'total_contributors': len(user_data),
-                        'total_additions': daily_data['additions'].sum(),
-                        'total_deletions': daily_data['deletions'].sum()
+                for future in finished:
+                    done += 1
+                    repo_config = futures[future]
+                    display_name = repo_config.get('display_name', repo_config['slug'])
+                    
+                    try:
+                        repo_result = future.result()
+                        if repo_result is not None:
+                            fetched[repo_config['slug']] = repo_result
+                            logger.info(f"📊 [{done}/{total}] Fetched: {display_name} ({repo_config['slug']})")
+                    except Exception as e:
+                        logger.error(f"❌ Error analyzing repository {display_name}: {str(e)}")
+                    
+                    progress('fetched', done, total, display_name)
+        finally:
+            # Never block on stuck workers; they exit on their own once their
+            # request returns and see should_stop()
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return fetched
+    
+    def _export_repositories(self, results: Dict, focus_user: Optional[str] = None,
+                             progress: Optional[Callable[[str, int, int, str], None]] = None):
+        """
+        Render charts and CSVs for every repository
+        
+        Rendering is CPU bound and holds the GIL, so repositories are spread
+        over worker processes. A single repository, or a platform where the
+        pool cannot start, is rendered in-process instead.
+        """
+        pending = list(results.values())
+        total = len(pending)
+        progress = progress or (lambda stage, done, total, display_name: None)
+        
+        if len(pending) > 1:
+            workers = min(os.cpu_count() or 1, len(pending))
+            try:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = {
+                        executor.submit(_export_repository_worker, self.output_dir, self.workspace,
+                                        self.dpi, repo_result, focus_user): repo_result
+                        for repo_result in pending
                     }
-                }
-                
-                # Create repository-specific visualizations
-                self._create_repository_visualizations(repo_slug, display_name, daily_data, user_data, focus_user)
-                
-                # Save repository-specific data
-                self._save_repository_data(repo_slug, display_name, daily_data, user_data)
-                
-                successful_repos.append((repo_slug, display_name))
-                logger.info(f"✅ Analysis complete for {display_name}")
-                
+                    
+                    for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                        repo_result = futures[future]
+                        try:
+                            future.result()
+                            logger.info(f"✅ Analysis complete for {repo_result['display_name']}")
+                        except Exception as e:
+                            logger.error(f"❌ Error rendering repository {repo_result['display_name']}: {str(e)}")
+                        progress('exported', done, total, repo_result['display_name'])
+                return
+            except (BrokenProcessPool, OSError) as e:
+                logger.warning(f"⚠️ Process pool unavailable ({e}); rendering in-process")
+        
+        for done, repo_result in enumerate(pending, 1):
+            try:
+                self.export_repository_result(repo_result, focus_user)
+                logger.info(f"✅ Analysis complete for {repo_result['display_name']}")
             except Exception as e:
-                logger.error(f"❌ Error analyzing repository {display_name}: {str(e)}")
-                continue
+                logger.error(f"❌ Error rendering repository {repo_result['display_name']}: {str(e)}")
+            progress('exported', done, total, repo_result['display_name'])
+    
+    def analyze_single_repo(self,
+                            repo_config: Dict,
+                            start_date: str,
+                            end_date: str,
+                            group_by: str = 'day',
+                            focus_user: Optional[str] = None) -> Optional[Dict]:
+        """
+        Fetch and summarize a single repository without rendering anything
+        
+        Only touches the Bitbucket API and pandas, so it is safe to call from
+        worker threads. Charts and files are produced by export_repository_result.
+        
+        Args:
+            repo_config: Dict with 'slug' and optional 'display_name' keys
+            start_date: Start date in YYYY-MM-DD format
+            end_date: End date in YYYY-MM-DD format
+            group_by: Grouping period ('day', 'week', 'month')
+            focus_user: Optional user to focus analysis on
+            
+        Returns:
+            Result dictionary for the repository, or None if it has no data
+        """
+        repo_slug = repo_config['slug']
+        display_name = repo_config.get('display_name', repo_slug)
+        
+        if self.should_stop():
+            return None
+        
+        # Analyze individual repository
+        result = self.analyzer.analyze_repository(
+            self.workspace, repo_slug, start_date, end_date, group_by,
+            by_user=True, focus_user=focus_user, commit_counts=True
+        )
+        
+        # analyze_repository returns None without commits and only the daily
+        # frame when no commit could be attributed to a user
+        if not isinstance(result, tuple) or result[0].empty or result[1].empty:
+            logger.warning(f"⚠️ No data found for repository: {display_name}")
+            return None
+        daily_data, user_data = result
+        
+        # Parse and sort dates once; every chart reuses the parsed column and calendar fields
+        daily_data['date'] = pd.to_datetime(daily_data['date'], format='%Y-%m-%d')
+        daily_data = daily_data.sort_values('date', ignore_index=True)
+        daily_data['_weekday'] = pd.Categorical(daily_data['date'].dt.day_name(),
+                                                categories=WEEKDAY_ORDER, ordered=True)
+        daily_data['_isoweek'] = daily_data['date'].dt.isocalendar().week
+        
+        # Store results with enhanced metadata
+        return {
+            'daily_data': daily_data,
+            'user_data': user_data,
+            'repo_slug': repo_slug,
+            'display_name': display_name,
+            'analysis_meta': {
+                'start_date': start_date,
+                'end_date': end_date,
+                'group_by': group_by,
+                'focus_user': focus_user,
+                'total_commits': daily_data['commits'].sum() if 'commits' in daily_data.columns else 0,
+                'total_contributors': len(user_data),
+                'total_additions': daily_data['additions'].sum(),
+                'total_deletions': daily_data['deletions'].sum()
+            }
+        }
+    
+    def export_repository_result(self, repo_result: Dict, focus_user: Optional[str] = None):
+        """
+        Create charts and CSV files for one analyzed repository
+        
+        pyplot keeps global state, so callers running analyze_single_repo in
+        a thread pool should call this from a single thread.
+        """
+        repo_slug = repo_result['repo_slug']
+        display_name = repo_result['display_name']
+        daily_data = repo_result['daily_data']
+        user_data = repo_result['user_data']
+        
+        # Create repository-specific visualizations
+        self._create_repository_visualizations(repo_slug, display_name, daily_data, user_data, focus_user)
+        
+        # Save repository-specific data
+        self._save_repository_data(repo_slug, display_name, daily_data, user_data)
+    
+    def finalize_analysis(self, results: Dict, focus_user: Optional[str] = None):
+        """Create the combined analysis and markdown report for a finished run"""
         
         # Create combined analysis if multiple successful repositories
-        if len(successful_repos) > 1:
+        if len(results) > 1:
             self._create_combined_analysis(results, focus_user)
         
         # Generate comprehensive report
         self._generate_analysis_report(results, focus_user)
-        
-        logger.info(f"🎉 Analysis complete! Processed {len(successful_repos)} repositories successfully")
-        return results
     
     def _create_repository_visualizations(self, 
                                         repo_slug: str,
@@ -177,8 +524,20 @@ class MultiRepoAnalyzer:
         self._create_summary_dashboard(repo_slug, display_name, daily_data, user_data, focus_user)
         
         # 4. Activity Heatmap (if enough data)
-        if len(daily_data) > 7:
+        if self._has_heatmap(daily_data):
             self._create_activity_heatmap(repo_slug, display_name, daily_data, focus_user)
+        else:
+            logger.info(f"Skipping heatmap for {display_name}: no commits to show")
+    
+    @staticmethod
+    def _has_heatmap(daily_data: pd.DataFrame) -> bool:
+        """
+        Whether a repository gets an activity heatmap
+        
+        It needs more than a week of data and at least one commit; an all-zero
+        heatmap carries no information. The report links the image only then.
+        """
+        return len(daily_data) > 7 and 'commits' in daily_data and bool((daily_data['commits'] > 0).any())
     
     def _create_timeline_chart(self, 
                              repo_slug: str,
@@ -187,21 +546,19 @@ class MultiRepoAnalyzer:
                              focus_user: Optional[str] = None):
         """Create enhanced timeline chart with repo name prominently displayed"""
         
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(15, 10))
+        fig = self._new_figure((15, 10))
+        ax1, ax2 = fig.subplots(2, 1)
         
-        # Prepare data
-        daily_data_copy = daily_data.copy()
-        if 'date' in daily_data_copy.columns:
-            daily_data_copy['date'] = pd.to_datetime(daily_data_copy['date'])
-            daily_data_copy = daily_data_copy.sort_values('date')
-        
-        dates = daily_data_copy['date']
-        additions = daily_data_copy.get('additions', [0] * len(dates))
-        deletions = daily_data_copy.get('deletions', [0] * len(dates))
+        # Prepare data (daily_data arrives sorted by date from analyze_single_repo).
+        # Columns are pulled out as arrays once so matplotlib does not convert
+        # each Series again on every call.
+        dates = daily_data['date'].to_numpy()
+        additions = daily_data['additions'].to_numpy(dtype=np.float64, copy=False)
+        deletions = daily_data['deletions'].to_numpy(dtype=np.float64, copy=False)
         
         # Chart 1: Daily changes with enhanced styling
         ax1.bar(dates, additions, alpha=0.8, color='#2ecc71', label='Additions', width=0.8)
-        ax1.bar(dates, [-d for d in deletions], alpha=0.8, color='#e74c3c', label='Deletions', width=0.8)
+        ax1.bar(dates, -deletions, alpha=0.8, color='#e74c3c', label='Deletions', width=0.8)
         
         # Enhanced title with repo name
         title = f'📈 Daily Code Changes - {display_name}'
@@ -210,18 +567,18 @@ class MultiRepoAnalyzer:
         ax1.set_title(title, fontsize=16, fontweight='bold', pad=20)
         ax1.set_ylabel('Lines of Code', fontsize=12)
         ax1.legend(loc='upper right')
-        ax1.grid(True, alpha=0.3)
         
         # Format x-axis
         if len(dates) > 0:
-            ax1.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d'))
-            ax1.xaxis.set_major_locator(mdates.DayLocator(interval=max(1, len(dates)//8)))
-            plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45)
+            self._apply_date_axis(ax1, len(dates))
         
         # Chart 2: Cumulative trends
-        cumulative_additions = daily_data_copy['additions'].cumsum()
-        cumulative_deletions = daily_data_copy['deletions'].cumsum()
-        net_changes = cumulative_additions - cumulative_deletions
+        cumulative_additions = np.cumsum(additions)
+        cumulative_deletions = np.cumsum(deletions)
+        if HAS_NUMEXPR and len(cumulative_additions) >= NUMEXPR_MIN_ROWS:
+            net_changes = ne.evaluate('cumulative_additions - cumulative_deletions')
+        else:
+            net_changes = cumulative_additions - cumulative_deletions
         
         ax2.plot(dates, cumulative_additions, color='#2ecc71', marker='o', 
                 linewidth=3, markersize=4, label='Cumulative Additions')
@@ -234,20 +591,14 @@ class MultiRepoAnalyzer:
         ax2.set_ylabel('Cumulative Lines', fontsize=12)
         ax2.set_xlabel('Date', fontsize=12)
         ax2.legend()
-        ax2.grid(True, alpha=0.3)
         
         # Format x-axis
         if len(dates) > 0:
-            ax2.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d'))
-            ax2.xaxis.set_major_locator(mdates.DayLocator(interval=max(1, len(dates)//8)))
-            plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45)
-        
-        plt.tight_layout()
+            self._apply_date_axis(ax2, len(dates))
         
         # Save with repo-specific filename
         filename = f"{self.output_dir}/{repo_slug}_timeline_analysis.png"
-        plt.savefig(filename, dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close()
+        self._save_figure(fig, filename)
         
         logger.info(f"📊 Timeline chart saved: {filename}")
     
@@ -262,24 +613,27 @@ class MultiRepoAnalyzer:
             return
         
         # Limit to top 12 users for better visibility
-        top_users = user_data.head(12).copy()
+        top_users = user_data.head(12)
         
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 8))
+        fig = self._new_figure((18, 8))
+        ax1, ax2 = fig.subplots(1, 2)
         
         # Chart 1: Horizontal bar chart for additions/deletions
-        users = top_users['name'] if 'name' in top_users.columns else top_users.index
+        users = top_users['name'] if 'name' in top_users.columns else top_users.index.to_series()
         additions = top_users.get('additions', [0] * len(users))
         deletions = top_users.get('deletions', [0] * len(users))
         
+        user_labels = self._truncate(users, 25).tolist()
+        
         y_pos = range(len(users))
         
         # Create horizontal bars
         bars1 = ax1.barh(y_pos, additions, alpha=0.8, color='#2ecc71', label='Additions')
-        bars2 = ax1.barh(y_pos, [-d for d in deletions], alpha=0.8, color='#e74c3c', label='Deletions')
+        bars2 = ax1.barh(y_pos, -np.asarray(deletions), alpha=0.8, color='#e74c3c', label='Deletions')
         
         # Customize chart
         ax1.set_yticks(y_pos)
-        ax1.set_yticklabels([str(u)[:25] + '...' if len(str(u)) > 25 else str(u) for u in users])
+        ax1.set_yticklabels(user_labels)
         ax1.set_xlabel('Lines of Code', fontsize=12)
         
         title = f'👥 User Contributions - {display_name}'
@@ -290,26 +644,21 @@ class MultiRepoAnalyzer:
         ax1.grid(True, alpha=0.3, axis='x')
         
         # Add value labels on bars
-        for bar, value in zip(bars1, additions):
-            if value > 0:
-                ax1.text(bar.get_width() + max(additions)*0.01, bar.get_y() + bar.get_height()/2,
-                        f'+{value:,}', ha='left', va='center', fontsize=8, color='#2ecc71')
-        
-        for bar, value in zip(bars2, deletions):
-            if value > 0:
-                ax1.text(-value - max(deletions)*0.01, bar.get_y() + bar.get_height()/2,
-                        f'-{value:,}', ha='right', va='center', fontsize=8, color='#e74c3c')
+        ax1.bar_label(bars1, labels=[f'+{v:,}' if v > 0 else '' for v in additions],
+                      padding=3, fontsize=8, color='#2ecc71')
+        ax1.bar_label(bars2, labels=[f'-{v:,}' if v > 0 else '' for v in deletions],
+                      padding=3, fontsize=8, color='#e74c3c')
         
         # Chart 2: Contribution distribution pie chart
         if len(top_users) > 0:
             top_10 = top_users.head(10)
-            total_changes = top_10.get('total_changes', top_10.get('additions', []) + top_10.get('deletions', []))
+            total_changes = self._total_changes(top_10)
             
-            if sum(total_changes) > 0:
-                labels = [str(u)[:15] + '...' if len(str(u)) > 15 else str(u) for u in top_10['name']]
+            if total_changes.sum() > 0:
+                labels = self._truncate(top_10['name'], 15).tolist()
                 
                 # Use a nice color palette
-                colors = plt.cm.Set3(range(len(labels)))
+                colors = _pyplot().cm.Set3(range(len(labels)))
                 
                 wedges, texts, autotexts = ax2.pie(total_changes, labels=labels, autopct='%1.1f%%',
                                                   colors=colors, startangle=90)
@@ -323,12 +672,9 @@ class MultiRepoAnalyzer:
                     autotext.set_fontweight('bold')
                     autotext.set_fontsize(8)
         
-        plt.tight_layout()
-        
         # Save with repo-specific filename
         filename = f"{self.output_dir}/{repo_slug}_user_contributions.png"
-        plt.savefig(filename, dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close()
+        self._save_figure(fig, filename)
         
         logger.info(f"👥 User contributions chart saved: {filename}")
     
@@ -340,20 +686,23 @@ class MultiRepoAnalyzer:
                                 focus_user: Optional[str] = None):
         """Create comprehensive summary dashboard"""
         
-        fig = plt.figure(figsize=(20, 12))
+        fig = self._new_figure((20, 12))
         
         # Create a grid layout
-        gs = fig.add_gridspec(3, 4, hspace=0.3, wspace=0.3)
+        gs = fig.add_gridspec(3, 4)
         
         # Main title
         fig.suptitle(f'📋 Repository Dashboard - {display_name}', 
-                    fontsize=20, fontweight='bold', y=0.95)
-        
-        # Calculate summary statistics
-        total_additions = daily_data['additions'].sum() if not daily_data.empty else 0
-        total_deletions = daily_data['deletions'].sum() if not daily_data.empty else 0
-        total_commits = daily_data['commits'].sum() if 'commits' in daily_data.columns and not daily_data.empty else 0
-        active_days = len(daily_data[daily_data['commits'] > 0]) if not daily_data.empty and 'commits' in daily_data.columns else 0
+                    fontsize=20, fontweight='bold')
+        
+        # Calculate summary statistics in a single pass over the numeric columns
+        has_commits = 'commits' in daily_data.columns
+        sum_columns = ['additions', 'deletions', 'commits'] if has_commits else ['additions', 'deletions']
+        totals = daily_data[sum_columns].sum() if not daily_data.empty else {}
+        total_additions = totals.get('additions', 0)
+        total_deletions = totals.get('deletions', 0)
+        total_commits = totals.get('commits', 0)
+        active_days = int((daily_data['commits'] > 0).sum()) if not daily_data.empty and has_commits else 0
         unique_contributors = len(user_data) if not user_data.empty else 0
         avg_changes_per_day = (total_additions + total_deletions) / len(daily_data) if not daily_data.empty else 0
         
@@ -369,79 +718,69 @@ class MultiRepoAnalyzer:
         ax1.set_ylabel('Count')
         
         # Add value labels on bars
-        for bar, value in zip(bars, values):
-            ax1.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(values)*0.01,
-                    f'{value:,}', ha='center', va='bottom', fontweight='bold', fontsize=10)
+        ax1.bar_label(bars, labels=[f'{v:,}' for v in values], padding=3, fontweight='bold', fontsize=10)
         
         # 2. Daily Activity Trend (middle left)
         ax2 = fig.add_subplot(gs[1, :2])
         if not daily_data.empty and len(daily_data) > 1:
-            dates = pd.to_datetime(daily_data['date'])
-            ax2.plot(dates, daily_data['additions'], color='#2ecc71', marker='o', 
+            dates = daily_data['date'].to_numpy()
+            ax2.plot(dates, daily_data['additions'].to_numpy(), color='#2ecc71', marker='o', 
                     linewidth=2, label='Additions')
-            ax2.plot(dates, daily_data['deletions'], color='#e74c3c', marker='s', 
+            ax2.plot(dates, daily_data['deletions'].to_numpy(), color='#e74c3c', marker='s', 
                     linewidth=2, label='Deletions')
             
             ax2.set_title('📈 Daily Activity Trend', fontsize=12, fontweight='bold')
             ax2.set_ylabel('Lines of Code')
             ax2.set_xlabel('Date')
             ax2.legend()
-            ax2.grid(True, alpha=0.3)
             
             # Format dates
-            ax2.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d'))
-            plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45)
+            self._apply_date_axis(ax2)
         
         # 3. Top Contributors (middle right)
         ax3 = fig.add_subplot(gs[1, 2:])
         if not user_data.empty:
             top_5 = user_data.head(5)
-            contributors = [str(name)[:20] + '...' if len(str(name)) > 20 else str(name) 
-                          for name in top_5['name']]
-            contributions = top_5.get('total_changes', top_5.get('additions', [0] * len(contributors)))
+            contributors = self._truncate(top_5['name'], 20).tolist()
+            contributions = self._total_changes(top_5)
             
             bars = ax3.barh(contributors, contributions, color='#3498db', alpha=0.8)
             ax3.set_title('🏆 Top 5 Contributors', fontsize=12, fontweight='bold')
             ax3.set_xlabel('Total Changes')
             
             # Add value labels
-            for bar, value in zip(bars, contributions):
-                ax3.text(bar.get_width() + max(contributions)*0.01, bar.get_y() + bar.get_height()/2,
-                        f'{value:,}', ha='left', va='center', fontweight='bold', fontsize=9)
+            ax3.bar_label(bars, labels=[f'{v:,}' for v in contributions], padding=3,
+                          fontweight='bold', fontsize=9)
         
         # 4. Activity Distribution (bottom left)
         ax4 = fig.add_subplot(gs[2, :2])
         if not daily_data.empty and 'commits' in daily_data.columns:
-            commit_counts = daily_data['commits'].value_counts().sort_index()
-            ax4.bar(commit_counts.index, commit_counts.values, color='#f39c12', alpha=0.8)
+            # Commit counts are small non-negative ints, so a bincount is the histogram
+            commit_counts = np.bincount(daily_data['commits'].to_numpy(dtype=np.int64, na_value=0))
+            observed = np.nonzero(commit_counts)[0]
+            ax4.bar(observed, commit_counts[observed], color='#f39c12', alpha=0.8)
             ax4.set_title('📊 Commits per Day Distribution', fontsize=12, fontweight='bold')
             ax4.set_xlabel('Commits per Day')
             ax4.set_ylabel('Number of Days')
-            ax4.grid(True, alpha=0.3)
         
         # 5. Weekly Activity Pattern (bottom right)
         ax5 = fig.add_subplot(gs[2, 2:])
-        if not daily_data.empty and len(daily_data) > 7:
-            daily_data_copy = daily_data.copy()
-            daily_data_copy['weekday'] = pd.to_datetime(daily_data_copy['date']).dt.day_name()
-            weekday_activity = daily_data_copy.groupby('weekday')['additions'].sum()
-            
-            # Reorder days
-            day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-            weekday_activity = weekday_activity.reindex([day for day in day_order if day in weekday_activity.index])
+        # Left empty when the frame counts commits and there are none
+        no_commits = has_commits and not (daily_data['commits'] > 0).any()
+        if len(daily_data) > 7 and not no_commits:
+            # Ordered categorical keys come back Monday..Sunday without a reindex
+            weekday_activity = daily_data.groupby('_weekday', observed=True)['additions'].sum()
             
             ax5.bar(range(len(weekday_activity)), weekday_activity.values, color='#9b59b6', alpha=0.8)
             ax5.set_title('📅 Weekly Activity Pattern', fontsize=12, fontweight='bold')
             ax5.set_xlabel('Day of Week')
             ax5.set_ylabel('Total Additions')
             ax5.set_xticks(range(len(weekday_activity)))
-            ax5.set_xticklabels([day[:3] for day in weekday_activity.index], rotation=45)
-            ax5.grid(True, alpha=0.3)
+            ax5.set_xticklabels(weekday_activity.index.astype(str).str.slice(0, 3), rotation=45)
         
         # Save dashboard
         filename = f"{self.output_dir}/{repo_slug}_summary_dashboard.png"
-        plt.savefig(filename, dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close()
+        self._save_figure(fig, filename, tight_bbox=True)
         
         logger.info(f"📋 Summary dashboard saved: {filename}")
     
@@ -450,40 +789,37 @@ class MultiRepoAnalyzer:
                                display_name: str, 
                                daily_data: pd.DataFrame,
                                focus_user: Optional[str] = None):
-        """Create activity heatmap for the repository"""
-        
-        fig, ax = plt.subplots(figsize=(14, 6))
-        
-        # Prepare data for heatmap
-        daily_data_copy = daily_data.copy()
-        daily_data_copy['date'] = pd.to_datetime(daily_data_copy['date'])
-        daily_data_copy['weekday'] = daily_data_copy['date'].dt.day_name()
-        daily_data_copy['week'] = daily_data_copy['date'].dt.isocalendar().week
-        
-        # Create pivot table
-        heatmap_data = daily_data_copy.pivot_table(
-            values='commits', 
-            index='weekday', 
-            columns='week', 
-            aggfunc='sum', 
-            fill_value=0
-        )
+        """Create activity heatmap for the repository; callers check _has_heatmap first"""
+        
+        fig = self._new_figure((14, 6))
+        ax = fig.subplots()
         
-        # Reorder weekdays
-        weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        heatmap_data = heatmap_data.reindex([day for day in weekday_order if day in heatmap_data.index])
+        # Accumulate commits straight into a weekday x week grid from the
+        # precomputed weekday/week columns instead of hashing a pivot table.
+        # Weeks are numbered by their rank among observed ISO weeks.
+        weekday_codes = daily_data['_weekday'].cat.codes.to_numpy()
+        weeks, week_codes = np.unique(daily_data['_isoweek'].to_numpy(), return_inverse=True)
+        grid = np.zeros((len(WEEKDAY_ORDER), len(weeks)), dtype=np.int64)
+        np.add.at(grid, (weekday_codes, week_codes), daily_data['commits'].to_numpy(dtype=np.int64, na_value=0))
+        
+        # Only show weekdays that occur in the data
+        present = np.bincount(weekday_codes, minlength=len(WEEKDAY_ORDER)) > 0
+        grid = grid[present]
+        weekday_labels = [day for day, shown in zip(WEEKDAY_ORDER, present) if shown]
         
         # Create heatmap
-        if HAS_SEABORN:
+        sns = _seaborn()
+        if sns is not None:
+            heatmap_data = pd.DataFrame(grid, index=weekday_labels, columns=weeks)
             sns.heatmap(heatmap_data, ax=ax, cmap='YlOrRd', annot=True, fmt='g', 
                        cbar_kws={'label': 'Commits'})
         else:
-            im = ax.imshow(heatmap_data.values, cmap='YlOrRd', aspect='auto')
-            ax.set_xticks(range(len(heatmap_data.columns)))
-            ax.set_yticks(range(len(heatmap_data.index)))
-            ax.set_xticklabels(heatmap_data.columns)
-            ax.set_yticklabels(heatmap_data.index)
-            plt.colorbar(im, ax=ax, label='Commits')
+            im = ax.imshow(grid, cmap='YlOrRd', aspect='auto')
+            ax.set_xticks(range(len(weeks)))
+            ax.set_yticks(range(len(weekday_labels)))
+            ax.set_xticklabels(weeks)
+            ax.set_yticklabels(weekday_labels)
+            fig.colorbar(im, ax=ax, label='Commits')
         
         # Customize
         title = f'🔥 Activity Heatmap - {display_name}'
@@ -493,12 +829,9 @@ class MultiRepoAnalyzer:
         ax.set_xlabel('Week Number')
         ax.set_ylabel('Day of Week')
         
-        plt.tight_layout()
-        
         # Save heatmap
         filename = f"{self.output_dir}/{repo_slug}_activity_heatmap.png"
-        plt.savefig(filename, dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close()
+        self._save_figure(fig, filename)
         
         logger.info(f"🔥 Activity heatmap saved: {filename}")
     
@@ -510,60 +843,86 @@ class MultiRepoAnalyzer:
         """Save repository data with enhanced metadata"""
         
         # Add metadata to data
-        daily_data_enhanced = daily_data.copy()
-        user_data_enhanced = user_data.copy()
-        
-        daily_data_enhanced['repository_slug'] = repo_slug
-        daily_data_enhanced['repository_name'] = display_name
-        daily_data_enhanced['workspace'] = self.workspace
-        
-        user_data_enhanced['repository_slug'] = repo_slug
-        user_data_enhanced['repository_name'] = display_name
-        user_data_enhanced['workspace'] = self.workspace
+        metadata = {
+            'repository_slug': repo_slug,
+            'repository_name': display_name,
+            'workspace': self.workspace
+        }
+        daily_data_enhanced = daily_data.drop(columns=HELPER_COLUMNS, errors='ignore').assign(**metadata)
+        user_data_enhanced = user_data.assign(**metadata)
         
         # Save CSV files with enhanced names
         daily_filename = f"{self.output_dir}/{repo_slug}_daily_data.csv"
         user_filename = f"{self.output_dir}/{repo_slug}_user_data.csv"
         
-        daily_data_enhanced.to_csv(daily_filename, index=False)
-        user_data_enhanced.to_csv(user_filename, index=False)
+        self._write_table(daily_data_enhanced, daily_filename)
+        self._write_table(user_data_enhanced, user_filename)
         
         logger.info(f"💾 Data saved: {daily_filename}, {user_filename}")
     
+    @staticmethod
+    def _write_table(df: pd.DataFrame, filename: str):
+        """
+        Write a DataFrame as CSV, plus a Parquet sibling when pyarrow is available
+        
+        The CSV always comes from pandas so its format (date rendering, minimal
+        quoting) stays the same for existing readers; the zstd-compressed
+        Parquet copy is far smaller and faster to load back.
+        """
+        df.to_csv(filename, index=False)
+        if HAS_PYARROW:
+            df.to_parquet(os.path.splitext(filename)[0] + '.parquet', index=False,
+                          compression='zstd', engine='pyarrow')
+    
     def _create_combined_analysis(self, results: Dict, focus_user: Optional[str] = None):
         """Create combined analysis across all repositories"""
         
         logger.info("🔗 Creating combined multi-repository analysis...")
         
-        # Combine all data
-        all_daily_data = []
-        all_user_data = []
-        repo_names = []
-        
-        for repo_slug, data in results.items():
-            daily_data = data['daily_data'].copy()
-            user_data = data['user_data'].copy()
-            display_name = data['display_name']
-            
-            daily_data['repository_slug'] = repo_slug
-            daily_data['repository_name'] = display_name
-            user_data['repository_slug'] = repo_slug  
-            user_data['repository_name'] = display_name
-            
-            all_daily_data.append(daily_data)
-            all_user_data.append(user_data)
-            repo_names.append(display_name)
+        # Combine all data; concat makes the only copy and the repository
+        # columns are filled in afterwards from per-repo row counts
+        repo_slugs = list(results)
+        repo_names = [data['display_name'] for data in results.values()]
+        all_daily_data = [data['daily_data'] for data in results.values()]
+        all_user_data = [data['user_data'] for data in results.values()]
         
         if all_daily_data and all_user_data:
             combined_daily = pd.concat(all_daily_data, ignore_index=True)
             combined_users = pd.concat(all_user_data, ignore_index=True)
             
+            # Repeated strings are stored as categoricals so groupby hashes int codes
+            daily_lengths = [len(df) for df in all_daily_data]
+            user_lengths = [len(df) for df in all_user_data]
+            slug_categories = list(dict.fromkeys(repo_slugs))
+            name_categories = list(dict.fromkeys(repo_names))
+            combined_daily['repository_slug'] = pd.Categorical(np.repeat(repo_slugs, daily_lengths),
+                                                               categories=slug_categories)
+            combined_daily['repository_name'] = pd.Categorical(np.repeat(repo_names, daily_lengths),
+                                                               categories=name_categories)
+            combined_users['repository_slug'] = pd.Categorical(np.repeat(repo_slugs, user_lengths),
+                                                               categories=slug_categories)
+            combined_users['repository_name'] = pd.Categorical(np.repeat(repo_names, user_lengths),
+                                                               categories=name_categories)
+            combined_users['name'] = combined_users['name'].astype(str).astype('category')
+            combined_users['_name_lower'] = combined_users['name'].str.lower()
+            
+            # Daily counts fit comfortably in int32; the narrower columns halve
+            # the bytes the dashboard's groupby and sums read (pandas still
+            # accumulates those reductions in int64)
+            int32_max = np.iinfo(np.int32).max
+            for column in ('additions', 'deletions', 'commits'):
+                values = combined_daily[column]
+                if pd.api.types.is_integer_dtype(values) and values.abs().max() <= int32_max:
+                    combined_daily[column] = values.astype(np.int32)
+            
             # Create combined visualization
             self._create_combined_dashboard(combined_daily, combined_users, repo_names, focus_user)
             
             # Save combined data
-            combined_daily.to_csv(f"{self.output_dir}/combined_daily_analysis.csv", index=False)
-            combined_users.to_csv(f"{self.output_dir}/combined_user_analysis.csv", index=False)
+            self._write_table(combined_daily.drop(columns=HELPER_COLUMNS, errors='ignore'),
+                              f"{self.output_dir}/combined_daily_analysis.csv")
+            self._write_table(combined_users.drop(columns=HELPER_COLUMNS, errors='ignore'),
+                              f"{self.output_dir}/combined_user_analysis.csv")
             
             logger.info("✅ Combined analysis complete!")
     
@@ -574,47 +933,47 @@ class MultiRepoAnalyzer:
                                  focus_user: Optional[str] = None):
         """Create comprehensive combined dashboard"""
         
-        fig = plt.figure(figsize=(24, 16))
-        gs = fig.add_gridspec(3, 3, hspace=0.3, wspace=0.3)
+        fig = self._new_figure((24, 16))
+        gs = fig.add_gridspec(3, 3)
         
         # Main title
         title = f'🔗 Multi-Repository Analysis Dashboard - {len(repo_names)} Repositories'
         if focus_user:
             title += f'\n👤 Focus: {focus_user}'
-        fig.suptitle(title, fontsize=22, fontweight='bold', y=0.95)
+        fig.suptitle(title, fontsize=22, fontweight='bold')
         
         # 1. Repository Comparison (top row, spans 2 columns)
         ax1 = fig.add_subplot(gs[0, :2])
-        repo_summary = combined_daily.groupby('repository_name').agg({
-            'additions': 'sum',
-            'deletions': 'sum',
-            'commits': 'sum'
-        }).reset_index()
-        
-        x = range(len(repo_summary))
+        # Aggregate once per (repository, date); the comparison bars, timeline,
+        # heatmap and overall totals are all derived from this frame
+        repo_daily = combined_daily.groupby(['repository_name', 'date'], observed=True, sort=False)[
+            ['additions', 'deletions', 'commits']].sum()
+        repo_groups = repo_daily.groupby(level='repository_name', observed=True, sort=False)
+        repo_summary = repo_groups.sum().reset_index()
+        
+        x = np.arange(len(repo_summary))
         width = 0.25
         
-        ax1.bar([i - width for i in x], repo_summary['additions'], width, 
+        ax1.bar(x - width, repo_summary['additions'], width, 
                label='Additions', color='#2ecc71', alpha=0.8)
         ax1.bar(x, repo_summary['deletions'], width, 
                label='Deletions', color='#e74c3c', alpha=0.8)
-        ax1.bar([i + width for i in x], repo_summary['commits'], width, 
+        ax1.bar(x + width, repo_summary['commits'], width, 
                label='Commits', color='#3498db', alpha=0.8)
         
         ax1.set_xlabel('Repository')
         ax1.set_ylabel('Count')
         ax1.set_title('📊 Repository Comparison', fontsize=14, fontweight='bold')
         ax1.set_xticks(x)
-        ax1.set_xticklabels([name[:20] + '...' if len(name) > 20 else name 
-                            for name in repo_summary['repository_name']], 
+        ax1.set_xticklabels(self._truncate(repo_summary['repository_name'], 20).tolist(),
                            rotation=45, ha='right')
         ax1.legend()
-        ax1.grid(True, alpha=0.3)
         
         # 2. Cross-Repository User Activity (top right)
         ax2 = fig.add_subplot(gs[0, 2])
         if focus_user:
-            user_repos = combined_users[combined_users['name'].str.contains(focus_user, case=False, na=False)]
+            user_repos = combined_users[combined_users['_name_lower'].str.contains(focus_user.lower(), regex=False,
+                                                                                   na=False)]
             if not user_repos.empty:
                 repos = user_repos['repository_name']
                 contributions = user_repos['total_changes']
@@ -623,7 +982,7 @@ class MultiRepoAnalyzer:
                 ax2.set_title(f'🎯 {focus_user}\nActivity Distribution', fontsize=12, fontweight='bold')
         else:
             # Show top contributors across all repos
-            top_cross_repo = combined_users.groupby('name').agg({
+            top_cross_repo = combined_users.groupby('name', observed=True).agg({
                 'total_changes': 'sum',
                 'commits': 'sum'
             }).reset_index().sort_values('total_changes', ascending=False).head(8)
@@ -631,147 +990,283 @@ class MultiRepoAnalyzer:
             ax2.barh(range(len(top_cross_repo)), top_cross_repo['total_changes'], 
                     color='#f39c12', alpha=0.8)
             ax2.set_yticks(range(len(top_cross_repo)))
-            ax2.set_yticklabels([str(name)[:15] + '...' if len(str(name)) > 15 else str(name) 
-                               for name in top_cross_repo['name']])
+            ax2.set_yticklabels(self._truncate(top_cross_repo['name'], 15).tolist())
             ax2.set_xlabel('Total Changes')
             ax2.set_title('🏆 Top Contributors\nAcross All Repos', fontsize=12, fontweight='bold')
-            ax2.grid(True, alpha=0.3)
         
         # 3. Timeline Comparison (middle row, spans all columns)
         ax3 = fig.add_subplot(gs[1, :])
         if 'date' in combined_daily.columns:
-            for i, repo in enumerate(repo_names):
-                repo_data = combined_daily[combined_daily['repository_name'] == repo]
-                if not repo_data.empty:
-                    dates = pd.to_datetime(repo_data['date'])
-                    color = plt.cm.Set1(i % 9)  # Cycle through colors
-                    ax3.plot(dates, repo_data['additions'], marker='o', 
-                            label=f'{repo}', linewidth=2, color=color)
+            # Evaluate the colormap once for all repositories, cycling through its 9 colors
+            palette = _pyplot().cm.Set1(np.arange(len(repo_names)) % 9)
+            for (repo, repo_data), color in zip(repo_groups, palette):
+                ax3.plot(repo_data.index.get_level_values('date'), repo_data['additions'], marker='o', 
+                        label=f'{repo}', linewidth=2, color=color)
         
         ax3.set_title('📈 Timeline Comparison Across Repositories', fontsize=14, fontweight='bold')
         ax3.set_ylabel('Daily Additions')
         ax3.set_xlabel('Date')
         ax3.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
-        ax3.grid(True, alpha=0.3)
         
         # Format dates
-        ax3.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d'))
-        plt.setp(ax3.xaxis.get_majorticklabels(), rotation=45)
+        self._apply_date_axis(ax3)
         
         # 4. Repository Activity Heatmap (bottom left)
         ax4 = fig.add_subplot(gs[2, :2])
-        repo_daily_summary = combined_daily.groupby(['repository_name', 'date']).agg({
-            'commits': 'sum'
-        }).reset_index()
+        pivot_data = self._activity_pivot(combined_daily)
         
-        if not repo_daily_summary.empty:
-            pivot_data = repo_daily_summary.pivot(index='repository_name', columns='date', values='commits').fillna(0)
-            
+        if not pivot_data.empty:
             # Limit columns if too many dates
             if len(pivot_data.columns) > 15:
                 pivot_data = pivot_data.iloc[:, -15:]  # Last 15 days
             
-            if HAS_SEABORN:
-                sns.heatmap(pivot_data, ax=ax4, cmap='YlOrRd', cbar_kws={'label': 'Commits'})
-            else:
-                im = ax4.imshow(pivot_data.values, cmap='YlOrRd', aspect='auto')
-                ax4.set_xticks(range(len(pivot_data.columns)))
-                ax4.set_yticks(range(len(pivot_data.index)))
-                ax4.set_xticklabels([str(col)[-5:] for col in pivot_data.columns])  # Show last 5 chars of date
-                ax4.set_yticklabels([name[:15] + '...' if len(name) > 15 else name 
-                                   for name in pivot_data.index])
-                plt.colorbar(im, ax=ax4, label='Commits')
+            # A plain quad mesh renders the same grid as sns.heatmap without its
+            # per-call annotation and tick machinery
+            grid = pivot_data.to_numpy(dtype=np.float32)
+            im = ax4.pcolormesh(grid, cmap='YlOrRd', rasterized=True)
+            ax4.set_xticks(np.arange(grid.shape[1]) + 0.5)
+            ax4.set_yticks(np.arange(grid.shape[0]) + 0.5)
+            ax4.set_xticklabels(pivot_data.columns.strftime('%m-%d'))
+            ax4.set_yticklabels(self._truncate(pivot_data.index.to_series(), 15).tolist())
+            ax4.invert_yaxis()
+            fig.colorbar(im, ax=ax4, label='Commits')
             
             ax4.set_title('🔥 Cross-Repository Activity Heatmap', fontsize=12, fontweight='bold')
             ax4.set_xlabel('Date')
             ax4.set_ylabel('Repository')
-            plt.setp(ax4.xaxis.get_majorticklabels(), rotation=45)
+            ax4.tick_params(axis='x', labelrotation=45)
         
         # 5. Summary Statistics (bottom right)
         ax5 = fig.add_subplot(gs[2, 2])
         total_repos = len(repo_names)
-        total_additions = combined_daily['additions'].sum()
-        total_deletions = combined_daily['deletions'].sum()
-        total_commits = combined_daily['commits'].sum()
-        total_contributors = len(combined_users['name'].unique())
+        sums = repo_daily.sum()
+        total_additions, total_deletions, total_commits = sums['additions'], sums['deletions'], sums['commits']
+        # The name column is categorical, and astype('category') keeps only the
+        # values present, so the categories are the distinct contributors
+        total_contributors = len(combined_users['name'].cat.categories)
         
         stats_data = [total_repos, total_additions, total_deletions, total_commits, total_contributors]
         stats_labels = ['Repos', 'Additions', 'Deletions', 'Commits', 'Contributors']
         colors = ['#9b59b6', '#2ecc71', '#e74c3c', '#3498db', '#1abc9c']
         
-        bars = ax5.bar(stats_labels, stats_data, color=colors, alpha=0.8)
+        bars = ax5.bar(stats_labels, stats_data, color=colors, alpha=0.8, rasterized=True)
         ax5.set_title('📊 Overall Statistics', fontsize=12, fontweight='bold')
         ax5.set_ylabel('Count')
         
         # Add value labels
-        for bar, value in zip(bars, stats_data):
-            ax5.text(bar.get_x() + bar.get_width()/2, bar.get_height() + max(stats_data)*0.01,
-                    f'{value:,}', ha='center', va='bottom', fontweight='bold', fontsize=9)
-        
-        plt.setp(ax5.xaxis.get_majorticklabels(), rotation=45)
+        ax5.bar_label(bars, labels=[f'{v:,}' for v in stats_data], padding=3, fontweight='bold', fontsize=9)
         
-        plt.tight_layout()
+        ax5.tick_params(axis='x', labelrotation=45)
         
         # Save combined dashboard
         filename = f"{self.output_dir}/combined_multi_repo_dashboard.png"
-        plt.savefig(filename, dpi=300, bbox_inches='tight', facecolor='white')
-        plt.close()
+        self._save_figure(fig, filename, tight_bbox=True)
         
         logger.info(f"🔗 Combined dashboard saved: {filename}")
     
+    def _activity_pivot(self, combined_daily: pd.DataFrame) -> pd.DataFrame:
+        """
+        Commits per repository (rows) and date (columns) for the combined heatmap
+        
+        With pyarrow installed the pivot is cached as a feather file, keyed by
+        a hash of the repository, date and commit columns it is built from.
+        """
+        source = combined_daily[['repository_name', 'date', 'commits']]
+        cache_filename = None
+        if HAS_PYARROW:
+            digest = pd.util.hash_pandas_object(source, index=False).to_numpy().tobytes()
+            cache_filename = self._cache_filename(self._cache_key(digest), '.feather')
+            try:
+                cached = feather.read_feather(cache_filename)
+                os.utime(cache_filename)
+            except (OSError, pyarrow.ArrowException):
+                pass
+            else:
+                pivot_data = cached.set_index('repository').rename_axis(None)
+                pivot_data.columns = pd.DatetimeIndex(pivot_data.columns)
+                return pivot_data
+        
+        # Sum commits straight into a repository x date grid; for a few
+        # repositories and dates this is far cheaper than pandas' unstack
+        repo_codes, repo_uniques = pd.factorize(source['repository_name'], sort=False)
+        date_codes, date_uniques = pd.factorize(source['date'], sort=True)
+        commit_grid = _sum_by_group(repo_codes, date_codes, source['commits'].to_numpy(dtype=np.int32),
+                                    len(repo_uniques), len(date_uniques))
+        pivot_data = pd.DataFrame(commit_grid, index=pd.Index(repo_uniques), columns=pd.DatetimeIndex(date_uniques))
+        
+        if cache_filename:
+            # Feather wants string column names and a default index
+            stored = pivot_data.rename(columns=lambda date: date.isoformat())
+            stored = stored.rename_axis('repository').reset_index()
+            self._store_cache_entry(cache_filename, lambda path: feather.write_feather(stored, path))
+        return pivot_data
+    
+    @staticmethod
+    def _cache_key(content) -> str:
+        """Name of the cache entry for content (str or bytes) under the current REPORT_CACHE_VERSION"""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        return hashlib.blake2b(b'%d\0' % REPORT_CACHE_VERSION + content, digest_size=16).hexdigest()
+    
+    def _cache_filename(self, key: str, suffix: str) -> str:
+        """Path of the cache entry for key"""
+        return os.path.join(self.output_dir, REPORT_CACHE_DIR, f"{key}{suffix}")
+    
+    @staticmethod
+    def _store_cache_entry(cache_filename: str, write: Callable[[str], None]):
+        """
+        Write a cache entry with write(path), then prune the oldest entries
+        
+        API jobs share the output directory, so the entry is written to a
+        temporary file and renamed into place; readers never see half a file.
+        Failures only cost the cache entry.
+        """
+        cache_dir = os.path.dirname(cache_filename)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, temp_filename = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+            os.close(fd)
+            try:
+                write(temp_filename)
+                os.replace(temp_filename, cache_filename)
+            finally:
+                if os.path.exists(temp_filename):
+                    os.remove(temp_filename)
+            
+            # Reads touch their entry, so the oldest modification times are
+            # the least recently used entries
+            entries = sorted(((entry.stat().st_mtime, entry.path) for entry in os.scandir(cache_dir)
+                              if entry.is_file() and not entry.name.endswith('.tmp')), reverse=True)
+            for _, path in entries[REPORT_CACHE_MAX_ENTRIES:]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass  # Pruned by another job
+        except OSError as e:
+            logger.warning(f"⚠️ Could not cache {cache_filename}: {e}")
+    
     def _generate_analysis_report(self, results: Dict, focus_user: Optional[str] = None):
         """Generate comprehensive markdown report"""
         
         report_filename = f"{self.output_dir}/analysis_report.md"
         
-        with open(report_filename, 'w') as f:
-            f.write("# 📊 Multi-Repository Analysis Report\n\n")
-            f.write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"**Workspace:** {self.workspace}\n")
-            f.write(f"**Repositories Analyzed:** {len(results)}\n")
-            if focus_user:
-                f.write(f"**Focus User:** {focus_user}\n")
-            f.write("\n---\n\n")
-            
-            # Individual repository analysis
-            f.write("## 📁 Individual Repository Analysis\n\n")
-            
-            for repo_slug, data in results.items():
-                display_name = data['display_name']
-                meta = data['analysis_meta']
-                
-                f.write(f"### {display_name}\n\n")
-                f.write(f"**Repository Slug:** `{repo_slug}`\n\n")
-                f.write(f"**Analysis Period:** {meta['start_date']} to {meta['end_date']}\n")
-                f.write(f"**Grouping:** {meta['group_by']}\n\n")
-                
-                f.write("**Statistics:**\n")
-                f.write(f"- Total Additions: {meta['total_additions']:,} lines\n")
-                f.write(f"- Total Deletions: {meta['total_deletions']:,} lines\n")
-                f.write(f"- Net Changes: {meta['total_additions'] - meta['total_deletions']:,} lines\n")
-                f.write(f"- Total Commits: {meta['total_commits']:,}\n")
-                f.write(f"- Contributors: {meta['total_contributors']}\n\n")
-                
-                f.write("**Generated Files:**\n")
-                f.write(f"- Timeline Analysis: `{repo_slug}_timeline_analysis.png`\n")
-                f.write(f"- User Contributions: `{repo_slug}_user_contributions.png`\n")
-                f.write(f"- Summary Dashboard: `{repo_slug}_summary_dashboard.png`\n")
-                f.write(f"- Activity Heatmap: `{repo_slug}_activity_heatmap.png`\n")
-                f.write(f"- Daily Data: `{repo_slug}_daily_data.csv`\n")
-                f.write(f"- User Data: `{repo_slug}_user_data.csv`\n\n")
-            
-            # Combined analysis section
-            if len(results) > 1:
-                f.write("## 🔗 Combined Analysis\n\n")
-                f.write("**Multi-Repository Files:**\n")
-                f.write("- Combined Dashboard: `combined_multi_repo_dashboard.png`\n")
-                f.write("- Combined Daily Data: `combined_daily_analysis.csv`\n")
-                f.write("- Combined User Data: `combined_user_analysis.csv`\n\n")
-            
-            f.write("---\n\n")
-            f.write("*Report generated by Multi-Repository Bitbucket LOC Analyzer*\n")
+        # Build the whole report in memory and write it in one call
+        parts: List[str] = [
+            "# 📊 Multi-Repository Analysis Report\n\n",
+            f"**Generated:** {datetime.now().isoformat(sep=' ', timespec='seconds')}\n",
+            f"**Workspace:** {self.workspace}\n",
+            f"**Repositories Analyzed:** {len(results)}\n",
+        ]
+        if focus_user:
+            parts.append(f"**Focus User:** {focus_user}\n")
+        parts.append("\n---\n\n")
+        parts.append(self._cached_report_body(results))
+        
+        with open(report_filename, 'w', encoding='utf-8') as f:
+            f.write("".join(parts))
         
         logger.info(f"📝 Analysis report saved: {report_filename}")
+    
+    def _cached_report_body(self, results: Dict) -> str:
+        """
+        Return the report body, reusing a copy cached under the output directory
+        
+        Besides the templates (covered by REPORT_CACHE_VERSION) the body
+        depends only on each repository's slug, display name, analysis_meta
+        and heatmap, and on whether Parquet files are written; a hash of
+        those is the cache key.
+        """
+        key_source = json.dumps({
+            'parquet': HAS_PYARROW,
+            'repositories': [[repo_slug, data['display_name'], data['analysis_meta'],
+                              self._has_heatmap(data['daily_data'])]
+                             for repo_slug, data in results.items()],
+        }, sort_keys=True, default=str)
+        cache_filename = self._cache_filename(self._cache_key(key_source), '.md')
+        
+        try:
+            with open(cache_filename, encoding='utf-8') as f:
+                body = f.read()
+            os.utime(cache_filename)
+            return body
+        except OSError:
+            pass
+        
+        body = self._render_report_body(results)
+        
+        def write(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(body)
+        
+        self._store_cache_entry(cache_filename, write)
+        return body
+    
+    @staticmethod
+    def _data_file_names(stem: str) -> str:
+        """Markdown list of the files _write_table produces for a table
+        
+        The CSV is always written by pandas; the Parquet copy only exists
+        when pyarrow is installed.
+        """
+        if HAS_PYARROW:
+            return f"`{stem}.csv`, `{stem}.parquet`"
+        return f"`{stem}.csv`"
+    
+    # One repository's section of the markdown report, filled with format_map
+    _REPO_SECTION_TEMPLATE = (
+        "### {display_name}\n\n"
+        "**Repository Slug:** `{repo_slug}`\n\n"
+        "**Analysis Period:** {start_date} to {end_date}\n"
+        "**Grouping:** {group_by}\n\n"
+        "**Statistics:**\n"
+        "- Total Additions: {total_additions:,} lines\n"
+        "- Total Deletions: {total_deletions:,} lines\n"
+        "- Net Changes: {net_changes:,} lines\n"
+        "- Total Commits: {total_commits:,}\n"
+        "- Contributors: {total_contributors}\n\n"
+        "**Generated Files:**\n"
+        "- Timeline Analysis: `{repo_slug}_timeline_analysis.png`\n"
+        "- User Contributions: `{repo_slug}_user_contributions.png`\n"
+        "- Summary Dashboard: `{repo_slug}_summary_dashboard.png`\n"
+        "{heatmap_line}"
+        "- Daily Data: {daily_files}\n"
+        "- User Data: {user_files}\n\n"
+    )
+    
+    def _render_repo_section(self, repo_slug: str, data: Dict) -> str:
+        """Render one repository's section of the markdown report"""
+        meta = data['analysis_meta']
+        return self._REPO_SECTION_TEMPLATE.format_map({
+            **meta,
+            'display_name': data['display_name'],
+            'repo_slug': repo_slug,
+            'net_changes': meta['total_additions'] - meta['total_deletions'],
+            'heatmap_line': (f"- Activity Heatmap: `{repo_slug}_activity_heatmap.png`\n"
+                             if self._has_heatmap(data['daily_data']) else ""),
+            'daily_files': self._data_file_names(f'{repo_slug}_daily_data'),
+            'user_files': self._data_file_names(f'{repo_slug}_user_data'),
+        })
+    
+    def _render_report_body(self, results: Dict) -> str:
+        """Render the per-repository and combined sections of the markdown report"""
+        
+        # The section count is known up front, so the parts are laid out in
+        # one list display rather than grown one append at a time
+        combined_section = (
+            "## 🔗 Combined Analysis\n\n"
+            "**Multi-Repository Files:**\n"
+            "- Combined Dashboard: `combined_multi_repo_dashboard.png`\n"
+            f"- Combined Daily Data: {self._data_file_names('combined_daily_analysis')}\n"
+            f"- Combined User Data: {self._data_file_names('combined_user_analysis')}\n\n"
+        ) if len(results) > 1 else ""
+        
+        return "".join([
+            "## 📁 Individual Repository Analysis\n\n",
+            *[self._render_repo_section(repo_slug, data) for repo_slug, data in results.items()],
+            combined_section,
+            "---\n\n",
+            "*Report generated by Multi-Repository Bitbucket LOC Analyzer*\n",
+        ])
 
 
 def main():
@@ -810,12 +1305,13 @@ def main():
         focus_user=FOCUS_USER
     )
     
-    print(f"\n🎉 Analysis complete! Results for {len(results)} repositories:")
+    summary = [f"\n🎉 Analysis complete! Results for {len(results)} repositories:\n"]
     for repo_slug, data in results.items():
         display_name = data['display_name']
         meta = data['analysis_meta']
-        print(f"  📁 {display_name}: {meta['total_contributors']} contributors, "
-              f"{meta['total_commits']} commits, {meta['total_additions']:,} additions")
+        summary.append(f"  📁 {display_name}: {meta['total_contributors']} contributors, "
+                       f"{meta['total_commits']} commits, {meta['total_additions']:,} additions\n")
+    sys.stdout.writelines(summary)
 
 if __name__ == "__main__":
     main()
@@ -8,23 +8,159 @@ and visualizes the changes.
 """
 
 import argparse
+import atexit
+import contextvars
 import requests
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 import os
 import json
+import re
+import logging
 import subprocess
 import tempfile
 import shutil
 import hashlib
+import shelve
 import time
+import threading
+import weakref
+import zipfile
 from dateutil.parser import parse
 from dateutil.relativedelta import relativedelta
 import concurrent.futures
+from collections import OrderedDict, defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from functools import partial
+from functools import lru_cache, partial, wraps
 from tqdm import tqdm
+from urllib.parse import quote, urlsplit
+from urllib3.util.retry import Retry
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+logger = logging.getLogger(__name__)
+
+# Connections kept alive per host by the shared HTTP session; covers the
+# commit workers of several repositories analyzed at once
+HTTP_POOL_SIZE = 32
+
+# Rate limiting and transient server errors are retried with backoff
+# instead of failing the commit outright
+HTTP_RETRY = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504],
+                   allowed_methods=['HEAD', 'GET'])
+
+# Stash commit pages requested concurrently once the page size is known
+PAGE_PREFETCH = 8
+
+# Answers to a plain-text diff request meaning the server cannot serve
+# that format at all; any other error only affects the one commit
+RAW_DIFF_UNSUPPORTED_STATUSES = (406, 415)
+
+# Per-user directory for the persistent commit stats cache, so runs from any
+# working directory share it and nothing is written into the checkout
+STATS_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+                               'loc-analyzer')
+
+# Above this many commits the stats are read from a local git log instead of
+# one diff request per commit; the bare clone is kept under the stats cache
+# directory and only fetched into on later runs (see _ensure_local_clone)
+BULK_STATS_MIN_COMMITS = 50
+
+# Binary files, generated code, etc. left out of the LOC counts; tuples so
+# str.endswith checks them all in one call
+SKIP_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.ico', '.bmp', '.tiff',
+                   '.zip', '.tar', '.gz', '.rar', '.7z', '.jar', '.war', '.ear',
+                   '.class', '.pyc', '.pyo', '.o', '.obj', '.dll', '.exe', '.so', '.dylib',
+                   '.min.js', '.min.css', '.pdf', '.doc', '.docx', '.ppt', '.pptx',
+                   '.xls', '.xlsx', '.svg', '.ttf', '.woff', '.woff2', '.eot',
+                   '.mp3', '.mp4', '.avi', '.mov', '.flv', '.webm', '.lock')
+SKIP_PATHS = ('node_modules/', 'dist/', 'build/', 'target/', '__pycache__/',
+              '.git/', '.svn/', '.idea/', '.vscode/', '.gradle/',
+              'vendor/', 'bin/', 'obj/')
+# Finds any of SKIP_PATHS anywhere in a path in a single scan
+SKIP_PATH_PATTERN = re.compile('|'.join(map(re.escape, SKIP_PATHS)))
+
+# Commit archives are kept in memory up to this size while downloading and
+# only spill to a temporary file beyond it
+ARCHIVE_SPOOL_BYTES = 64 * 1024 * 1024
+# Read size for archive downloads
+DOWNLOAD_CHUNK_BYTES = 256 * 1024
+
+# Commits touching at most this many files are measured by fetching just
+# those files at both revisions; larger ones download full archives
+SPARSE_CLOC_MAX_FILES = 200
+
+# Archives that inflate to more than this are extracted by several threads;
+# zlib releases the GIL, so members decompress in parallel
+PARALLEL_EXTRACT_MIN_BYTES = 8 * 1024 * 1024
+EXTRACT_WORKERS = min(8, os.cpu_count() or 1)
+# Archive members larger than this are copied out in reads of this size
+# instead of shutil's 64 KB default
+EXTRACT_BUFFER_BYTES = 256 * 1024
+
+# Every UTC offset (and DST switch) in use falls on a quarter hour, so all
+# timestamps within one quarter hour share the same local date
+QUARTER_HOUR_MS = 15 * 60 * 1000
+
+# Most commit details remembered by one analyze_repository call
+COMMIT_INFO_MEMO_SIZE = 4096
+
+# The commit-info memo of the analysis running in the current context; set
+# per analyze_repository call and copied into its commit workers
+_commit_info_memo = contextvars.ContextVar('commit_info_memo', default=None)
+
+
+class _LRUMemo:
+    """Thread-safe mapping that keeps only the maxsize most recently used entries"""
+    
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+# One lock per persistent clone directory, shared by every analyzer in the
+# process so concurrent analyses of a repository do not clone or fetch twice
+_clone_locks = {}
+_clone_locks_lock = threading.Lock()
+
+
+def _scoped_commit_info_memo(method):
+    """Give every call of method its own commit-info memo (see _get_commit_info)"""
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        token = _commit_info_memo.set(_LRUMemo(COMMIT_INFO_MEMO_SIZE))
+        try:
+            return method(*args, **kwargs)
+        finally:
+            _commit_info_memo.reset(token)
+    return wrapper
 
 
 class APICache:
@@ -63,49 +199,184 @@ class APICache:
         Returns:
             dict: Cached response data or None if not in cache or expired
         """
+        data = self._read(url, params)
+        if data and time.time() - data['timestamp'] < self.expiry:
+            return data['content']
+        return None
+    
+    def get_stale(self, url, params=None):
+        """Retrieve an expired entry so the server can be asked if it changed
+        
+        Args:
+            url (str): The API URL
+            params (dict): Optional query parameters
+            
+        Returns:
+            tuple: (content, validators) where validators are the ETag and
+                Last-Modified headers the response was stored with, or
+                (None, {}) if there is no entry
+        """
+        data = self._read(url, params)
+        if not data:
+            return None, {}
+        return data['content'], data.get('validators', {})
+    
+    def _read(self, url, params):
+        """Load the cache file for url and params, or None if missing or corrupted"""
         key = self._get_cache_key(url, params)
         cache_file = os.path.join(self.cache_dir, key)
         
         if os.path.exists(cache_file):
-            with open(cache_file, 'r') as f:
+            with open(cache_file, 'rb') as f:
                 try:
-                    data = json.load(f)
-                    if time.time() - data['timestamp'] < self.expiry:
-                        return data['content']
-                except (json.JSONDecodeError, KeyError):
+                    data = _json_loads(f.read())
+                    if 'timestamp' in data and 'content' in data:
+                        return data
+                except (json.JSONDecodeError, TypeError):
                     # Handle corrupted cache files
                     pass
         return None
     
-    def set(self, url, params, content):
+    def set(self, url, params, content, validators=None):
         """Save API response to cache
         
         Args:
             url (str): The API URL
             params (dict): Optional query parameters
             content (dict): The API response to cache
+            validators (dict): ETag / Last-Modified response headers, used to
+                revalidate the entry once it expires
         """
         key = self._get_cache_key(url, params)
         cache_file = os.path.join(self.cache_dir, key)
         
-        with open(cache_file, 'w') as f:
-            json.dump({
+        with open(cache_file, 'wb') as f:
+            f.write(_json_dumps({
                 'timestamp': time.time(),
-                'content': content
-            }, f)
+                'content': content,
+                'validators': validators or {}
+            }))
+
+
+class CommitStatsCache:
+    """Persistent cache of per-commit line counts
+    
+    Commits are immutable, so unlike APICache entries never expire. One
+    shelve file is shared by every analyzer in the process and guarded by
+    a lock, since commits are processed on worker threads. Entries read or
+    written in this process are also kept in memory, so re-running an
+    analysis (another grouping, another user) does not go back to disk.
+    """
+    _shared = {}
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, cache_dir=None):
+        """Initialize the cache
+        
+        Args:
+            cache_dir (str): Directory holding the shelve file (default STATS_CACHE_DIR)
+        """
+        self.cache_dir = os.path.abspath(cache_dir or STATS_CACHE_DIR)
+        self._lock = threading.Lock()
+        self._db = None
+        self._memory = {}
+        atexit.register(self.close)
+    
+    @classmethod
+    def shared(cls, cache_dir=None):
+        """Return the process-wide cache for cache_dir, creating it on first use"""
+        cache_dir = os.path.abspath(cache_dir or STATS_CACHE_DIR)
+        with cls._shared_lock:
+            if cache_dir not in cls._shared:
+                cls._shared[cache_dir] = cls(cache_dir)
+            return cls._shared[cache_dir]
+    
+    def _open(self):
+        """Open the shelve on first use, falling back to an in-memory dict"""
+        if self._db is None:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                self._db = shelve.open(os.path.join(self.cache_dir, 'commit_stats'))
+            except OSError as e:
+                logger.warning("Commit stats cache unavailable: %s", e)
+                self._db = {}
+        return self._db
+    
+    def get(self, key):
+        """Return the cached stats for key, or None
+        
+        Args:
+            key (str): Cache key from BitbucketLOCAnalyzer._stats_cache_key
+            
+        Returns:
+            dict: Cached additions and deletions, or None if not cached
+        """
+        stats = self._memory.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._open().get(key)
+            if stats is None:
+                return None
+            self._memory[key] = stats
+        return dict(stats)
+    
+    def set(self, key, stats):
+        """Store the stats for key
+        
+        Args:
+            key (str): Cache key from BitbucketLOCAnalyzer._stats_cache_key
+            stats (dict): Additions and deletions of the commit
+        """
+        stats = {'additions': stats['additions'], 'deletions': stats['deletions']}
+        with self._lock:
+            self._open()[key] = stats
+        self._memory[key] = stats
+    
+    def close(self):
+        """Flush and close the shelve file"""
+        with self._lock:
+            if isinstance(self._db, shelve.Shelf):
+                self._db.close()
+            self._db = None
 
 
 class BitbucketLOCAnalyzer:
-    def __init__(self, base_url=None, token=None):
+    def __init__(self, base_url=None, token=None, *, rate_limit=None):
         """Initialize the analyzer with Bitbucket/Stash credentials.
         
         Args:
             base_url (str): Base URL for self-hosted Bitbucket/Stash instance (e.g. https://stash.example.com)
             token (str): Bitbucket access token for Bearer authentication
+            rate_limit (float): Most API requests started per second across all
+                worker threads, or None for no limit
         """
         self.headers = {}
         self.auth = None
         self.cache = APICache()  # Initialize API cache
+        self.stats_cache = CommitStatsCache.shared()  # Line counts of already measured commits
+        # Shared by all worker threads so API calls and archive downloads reuse
+        # pooled keep-alive connections instead of a new TLS handshake each
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE,
+                                                max_retries=HTTP_RETRY)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # Pooled connections are closed by close() or with the analyzer
+        self._close_session = weakref.finalize(self, self.session.close)
+        # Downloads a commit's parent archive while the worker fetches the
+        # commit's own archive; threads are only started when first used
+        self._download_pool = ThreadPoolExecutor(max_workers=HTTP_POOL_SIZE, thread_name_prefix='archive')
+        self._close_download_pool = weakref.finalize(self, self._download_pool.shutdown, False)
+        # Request start times are spaced 1/rate_limit apart (see _throttle)
+        self.rate_limit = rate_limit
+        self._rate_lock = threading.Lock()
+        self._next_request_at = 0.0
+        # Cleared once a Stash server turns out not to serve raw diffs
+        # (see _fetch_stash_raw_diff), so later commits skip straight to JSON
+        self._stash_raw_diff = True
+        # Optional callable polled between API pages and commits; returning True
+        # abandons the remaining work (used by the API for job cancellation)
+        self.should_stop = None
         
         # Set base URL for API (default to Bitbucket Cloud if not specified)
         self.base_url = base_url if base_url else "https://api.bitbucket.org"
@@ -124,6 +395,25 @@ class BitbucketLOCAnalyzer:
             # For Bitbucket Cloud
             self.api_base = f"{self.base_url}/2.0"  # Add API version for Bitbucket Cloud
         
+        # Bind the Stash or Cloud variant of the per-commit helpers once, so
+        # the hot paths call them directly instead of re-checking is_stash
+        if self.is_stash:
+            self._hash_field = 'id'
+            self._commit_url = self._stash_commit_url
+            self._archive_url = self._stash_archive_url
+            self._raw_file_url = self._stash_raw_file_url
+            self._changed_paths = self._stash_changed_paths
+            self._fetch_diff_stats = self._fetch_stash_diff_stats
+            self._commit_fields = self._stash_commit_fields
+        else:
+            self._hash_field = 'hash'
+            self._commit_url = self._cloud_commit_url
+            self._archive_url = self._cloud_archive_url
+            self._raw_file_url = self._cloud_raw_file_url
+            self._changed_paths = self._cloud_changed_paths
+            self._fetch_diff_stats = self._fetch_cloud_diff_stats
+            self._commit_fields = self._cloud_commit_fields
+        
         if token:
             # Set the Bearer token format consistently for both Stash and Cloud
             if token.startswith('Bearer '):
@@ -133,8 +423,34 @@ class BitbucketLOCAnalyzer:
             
             print(f"Using Bearer token authentication: {token[:5]}...")
             print(f"Headers: {self.headers}")
+            # Every session request carries the token; diff JSON compresses
+            # well, so ask for it gzipped explicitly
+            self.session.headers.update(self.headers)
+            self.session.headers['Accept-Encoding'] = 'gzip, deflate'
         else:
             raise ValueError("A token must be provided for Bearer authentication")
+    
+    def _throttle(self):
+        """Wait until the next request may start under rate_limit"""
+        if not self.rate_limit:
+            return
+        with self._rate_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at)
+            self._next_request_at = start_at + 1 / self.rate_limit
+        if start_at > now:
+            time.sleep(start_at - now)
+    
+    def close(self):
+        """Close the pooled HTTP connections and the archive download threads"""
+        self._close_download_pool()
+        self._close_session()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
             
     def test_connection(self, workspace=None, repo_slug=None):
         """
@@ -156,7 +472,8 @@ class BitbucketLOCAnalyzer:
             # Make a HEAD request to the base URL to check if the server is reachable
             print(f"Testing basic connectivity to {test_url}")
             try:
-                response = requests.head(test_url, timeout=10)
+                self._throttle()
+                response = self.session.head(test_url, timeout=10)
                 print(f"Server is reachable. Status code: {response.status_code}")
             except requests.exceptions.RequestException as e:
                 print(f"Cannot reach server: {e}")
@@ -225,6 +542,7 @@ class BitbucketLOCAnalyzer:
         limit = 100
         page = 1
         pagelen = 100  # For Bitbucket Cloud
+        next_url = None  # Bitbucket Cloud's link to the following page
         
         # If no end date is provided, use current date
         if not end_date:
@@ -240,8 +558,14 @@ class BitbucketLOCAnalyzer:
         start_timestamp = datetime.strptime(start_date, '%Y-%m-%d').strftime('%Y-%m-%dT%H:%M:%SZ')
         # End timestamp in ISO format
         end_timestamp = datetime.strptime(end_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59).strftime('%Y-%m-%dT%H:%M:%SZ')
+        # Start of the range in Unix epoch milliseconds, as Stash reports commit times
+        start_timestamp_ms = int(datetime.strptime(start_date, '%Y-%m-%d').timestamp() * 1000)
             
         while True:
+            if self.should_stop and self.should_stop():
+                print("Stop requested, abandoning commit retrieval")
+                return []
+            
             # Different APIs for Stash/Server vs Cloud
             if self.is_stash:
                 # Stash/Bitbucket Server API
@@ -284,6 +608,11 @@ class BitbucketLOCAnalyzer:
                 if not self.is_stash:
                     params['until'] = end_timestamp
             
+            if next_url:
+                # The next page URL already carries every query parameter
+                url = next_url
+                params = {}
+            
             # Make the request using our helper method
             response_json = self._make_request(url, params)
             
@@ -299,12 +628,20 @@ class BitbucketLOCAnalyzer:
                 commits = response_json['values']
                 all_commits.extend(commits)
                 
-                # Check if there are more commits
-                if response_json.get('isLastPage', True):
+                # Check if there are more commits; Stash lists newest first,
+                # so a page entirely before the range means the rest is too
+                if response_json.get('isLastPage', True) or _page_older_than(commits, start_timestamp_ms):
                     break
                 
-                # Update start parameter for next page
-                start = response_json.get('nextPageStart', 0)
+                # The first page tells us the server's page size, so the
+                # remaining pages can be requested several at a time
+                next_start = response_json.get('nextPageStart', start + len(commits))
+                remaining = self._prefetch_stash_pages(url, limit, next_start, stride=next_start - start,
+                                                       oldest_ms=start_timestamp_ms)
+                if remaining is None:
+                    return []
+                all_commits.extend(remaining)
+                break
             else:
                 # Bitbucket Cloud format
                 if 'values' not in response_json or not response_json['values']:
@@ -318,21 +655,17 @@ class BitbucketLOCAnalyzer:
                     break
                 
                 # Get the next page URL
-                url = response_json['next']
-                # When using a direct URL, we don't need params anymore
-                params = {}
+                next_url = response_json['next']
+        
+        if not self.is_stash:
+            self._add_cloud_timestamps(all_commits)
             
         # Post-process for date filtering if needed (particularly for Stash/Bitbucket Server)
         if start_date or end_date:
             filtered_commits = []
-            start_timestamp_ms = 0
             end_timestamp_ms = float("inf")
             
-            # Convert date strings to timestamp in milliseconds if provided
-            if start_date:
-                start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-                start_timestamp_ms = int(start_dt.timestamp() * 1000)
-                
+            # Convert the end date to a timestamp in milliseconds if provided
             if end_date:
                 end_dt = datetime.strptime(end_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
                 end_timestamp_ms = int(end_dt.timestamp() * 1000)
@@ -355,7 +688,77 @@ class BitbucketLOCAnalyzer:
         
         return all_commits
     
-    def get_commit_stats(self, workspace, repo_slug, commit_hash, file_extensions=None):
+    def _add_cloud_timestamps(self, commits):
+        """
+        Give Bitbucket Cloud commits the authorTimestamp and committerTimestamp
+        fields (Unix epoch milliseconds) that Stash commits carry.
+        
+        All dates are parsed in one pass, so the date filter and the commit
+        workers read integers instead of parsing each date string again.
+        
+        Args:
+            commits (list): Cloud commits, updated in place
+        """
+        author_dates = [commit.get('date', '1970-01-01T00:00:00Z') for commit in commits]
+        committer_dates = [commit.get('committer_date', date) for commit, date in zip(commits, author_dates)]
+        author_ms = _iso_timestamps_ms(author_dates).tolist()
+        committer_ms = _iso_timestamps_ms(committer_dates).tolist()
+        for commit, author_timestamp_ms, committer_timestamp_ms in zip(commits, author_ms, committer_ms):
+            commit['authorTimestamp'] = author_timestamp_ms
+            commit['committerTimestamp'] = committer_timestamp_ms
+    
+    def _prefetch_stash_pages(self, url, limit, start, stride, oldest_ms=0):
+        """
+        Fetch the remaining Stash/Bitbucket Server commit pages concurrently.
+        
+        Pages are requested PAGE_PREFETCH at a time at the offsets they would
+        have if every page is full, and consumed in ascending order. If a
+        page's nextPageStart disagrees with the guessed offsets, the rest of
+        that batch is discarded and fetching resumes from nextPageStart.
+        Fetching stops after the first page whose commits all predate
+        oldest_ms.
+        
+        Args:
+            url (str): Commits endpoint URL
+            limit (int): Requested page size
+            start (int): Offset of the first page still to fetch
+            stride (int): Number of commits per full page, from the first response
+            oldest_ms (int): Start of the requested range, in Unix epoch milliseconds
+            
+        Returns:
+            list: Commits from the remaining pages, or None if a request failed
+                or a stop was requested
+        """
+        if stride <= 0:
+            stride = limit
+        
+        commits = []
+        with ThreadPoolExecutor(max_workers=PAGE_PREFETCH) as executor:
+            while True:
+                if self.should_stop and self.should_stop():
+                    print("Stop requested, abandoning commit retrieval")
+                    return None
+                
+                starts = [start + i * stride for i in range(PAGE_PREFETCH)]
+                pages = executor.map(lambda page_start: self._make_request(url, {'limit': limit,
+                                                                                 'start': page_start}),
+                                     starts)
+                for page_start, response_json in zip(starts, pages):
+                    if page_start != start:
+                        # Offsets drifted from the guess; refetch from the real start
+                        break
+                    if not response_json:
+                        return None
+                    if not response_json.get('values'):
+                        return commits
+                    
+                    commits.extend(response_json['values'])
+                    if response_json.get('isLastPage', True) or _page_older_than(response_json['values'],
+                                                                                 oldest_ms):
+                        return commits
+                    start = response_json.get('nextPageStart', start + len(response_json['values']))
+    
+    def get_commit_stats(self, workspace, repo_slug, commit_hash, file_extensions=None, commit=None):
         """
         Get statistics for a specific commit.
         
@@ -364,79 +767,529 @@ class BitbucketLOCAnalyzer:
             repo_slug (str): Repository slug
             commit_hash (str): Commit hash
             file_extensions (list): List of file extensions to include (e.g., ['.py', '.js'])
+            commit (dict): The commit as listed by get_commits, if already fetched
             
         Returns:
             dict: Dictionary with additions and deletions
         """
-        if self.is_stash:
-            # First check if it's a merge commit by getting commit info
-            url = f"{self.api_base}/rest/api/1.0/projects/{workspace}/repos/{repo_slug}/commits/{commit_hash}"
-            commit_info = self._make_request(url)
-            
-            # Skip merge commits (has more than one parent)
-            if commit_info and len(commit_info.get('parents', [])) > 1:
-                return {'additions': 0, 'deletions': 0}
+        cache_key = self._stats_cache_key('commit_stats', workspace, repo_slug, commit_hash, file_extensions)
+        cached = self.stats_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # str.endswith takes a tuple and checks every extension in C
+        extensions = tuple(file_extensions) if file_extensions else None
+        
+        counts = self._fetch_diff_stats(workspace, repo_slug, commit_hash, extensions, commit=commit)
+        if counts is None:
+            # If request failed, return zeros
+            return {'additions': 0, 'deletions': 0}
+        
+        stats = {
+            'additions': counts[0],
+            'deletions': counts[1]
+        }
+        # Only successful lookups are cached; failed requests return zeros above
+        self.stats_cache.set(cache_key, stats)
+        return stats
+    
+    def _fetch_stash_diff_stats(self, workspace, repo_slug, commit_hash, extensions=None,
+                                skip_ignored_files=False, commit=None):
+        """
+        Count a commit's added and removed lines from the Stash/Bitbucket Server diff.
+        
+        Args:
+            workspace (str): Project key
+            repo_slug (str): Repository slug
+            commit_hash (str): Commit hash
+            extensions (tuple): File extensions to include, or None for all
+            skip_ignored_files (bool): If True, also drop files _should_skip_file rejects
+            commit (dict): The commit as listed by get_commits, if already fetched
             
-            # For Stash/Bitbucket Server - get detailed diff information for more accurate counts
-            url = f"{self.api_base}/rest/api/1.0/projects/{workspace}/repos/{repo_slug}/commits/{commit_hash}/diff"
-        else:
-            # For Bitbucket Cloud
-            url = f"{self.api_base}/repositories/{workspace}/{repo_slug}/diffstat/{commit_hash}"
+        Returns:
+            tuple: (additions, deletions), or None if the request failed
+        """
+        # First check if it's a merge commit by getting commit info
+        commit_info = self._get_commit_info(workspace, repo_slug, commit_hash, commit)
+        
+        # Skip merge commits (has more than one parent)
+        if commit_info and len(commit_info.get('parents', [])) > 1:
+            return 0, 0
+        
+        # The plain-text diff is a fraction of the JSON's size and is counted
+        # with a few bytes.count calls instead of walking hunks and segments
+        if self._stash_raw_diff:
+            diff_bytes = self._fetch_stash_raw_diff(workspace, repo_slug, commit_hash)
+            if diff_bytes is not None:
+                return self._count_unified_diff(diff_bytes, extensions, skip_ignored_files)
+        
+        # Get detailed diff information for more accurate counts; context lines
+        # and comments are never counted, so leave them out of the response
+        url = (f"{self.api_base}/rest/api/1.0/projects/{workspace}/repos/{repo_slug}/commits/{commit_hash}/diff"
+               "?contextLines=0&withComments=false")
+        
+        if HAS_IJSON:
+            # Count the diff while it downloads instead of loading it whole
+            return self._stream_stash_diff_stats(url, extensions, skip_ignored_files)
         
-        # Make the request using our helper method
         response_json = self._make_request(url)
+        if not response_json:
+            return None
+        return self._count_stash_diffs(response_json.get('diffs', []), extensions, skip_ignored_files)
+    
+    def _fetch_cloud_diff_stats(self, workspace, repo_slug, commit_hash, extensions=None,
+                                skip_ignored_files=False, commit=None):
+        """
+        Count a commit's added and removed lines from the Bitbucket Cloud diffstat.
         
+        Takes the same arguments as _fetch_stash_diff_stats; the diffstat
+        already has per-file totals, so the commit itself is not needed.
+        
+        Returns:
+            tuple: (additions, deletions), or None if the request failed
+        """
+        url = f"{self.api_base}/repositories/{workspace}/{repo_slug}/diffstat/{commit_hash}"
+        response_json = self._make_request(url)
         if not response_json:
-            # If request failed, return zeros
-            return {'additions': 0, 'deletions': 0}
+            return None
         
-        # Calculate additions and deletions from diff statistics
         additions = 0
         deletions = 0
+        for file in response_json.get('values', []):
+            # Filter by file extension if specified
+            file_path = file.get('new', {}).get('path', '') or file.get('old', {}).get('path', '')
+            if skip_ignored_files and self._should_skip_file(file_path):
+                continue
+                
+            if extensions and not file_path.endswith(extensions):
+                continue
+                
+            # Add up additions and deletions from each file
+            additions += file.get('lines_added', 0)
+            deletions += file.get('lines_removed', 0)
         
-        if self.is_stash:
-            # Stash/Bitbucket Server format - improved processing
-            for diff_file in response_json.get('diffs', []):
-                # Check file extension if specified
-                source = diff_file.get('source')
-                destination = diff_file.get('destination')
-                file_path = ''
+        return additions, deletions
+    
+    def _fetch_stash_raw_diff(self, workspace, repo_slug, commit_hash):
+        """
+        Download a Stash/Bitbucket Server commit's diff against its parent as plain text.
+        
+        Servers without the raw diff endpoint answer 406/415 or send JSON;
+        that switches the raw diff off for the rest of the analysis. Other
+        failures only send this commit to the JSON diff.
+        
+        Args:
+            workspace (str): Project key
+            repo_slug (str): Repository slug
+            commit_hash (str): Commit hash
+            
+        Returns:
+            bytes: The unified diff, or None if it is not available
+        """
+        url = f"{self.api_base}/rest/api/1.0/projects/{workspace}/repos/{repo_slug}/diff"
+        try:
+            self._throttle()
+            response = self.session.get(url, params={'until': commit_hash, 'contextLines': 0},
+                                        headers={'Accept': 'text/plain'}, timeout=30)
+        except requests.exceptions.RequestException as e:
+            logger.debug("Raw diff request for %s failed: %s", commit_hash, e)
+            return None
+        
+        if (response.status_code in RAW_DIFF_UNSUPPORTED_STATUSES
+                or response.status_code == 200 and response.content.lstrip().startswith(b'{')):
+            logger.debug("Raw diffs not available (HTTP %s), using the JSON diff", response.status_code)
+            self._stash_raw_diff = False
+            return None
+        if response.status_code != 200:
+            logger.debug("Raw diff for %s failed (HTTP %s), using the JSON diff", commit_hash, response.status_code)
+            return None
+        return response.content
+    
+    def _count_unified_diff(self, diff_bytes, extensions=None, skip_ignored_files=False):
+        """
+        Count added and removed lines in a unified diff.
+        
+        Each file's hunks start at its first '@@' line, and every hunk line
+        beginning with '+' or '-' is an added or removed line, so counting
+        those line starts in C is enough. File headers ('--- ', '+++ ') sit
+        before the first hunk and are never counted.
+        
+        Args:
+            diff_bytes (bytes): Output of git diff or a Bitbucket raw diff
+            extensions (tuple): File extensions to include, or None for all
+            skip_ignored_files (bool): If True, also drop files _should_skip_file rejects
+            
+        Returns:
+            tuple: (additions, deletions)
+        """
+        additions = 0
+        deletions = 0
+        for file_diff in (b'\n' + diff_bytes).split(b'\ndiff --git ')[1:]:
+            hunks_start = file_diff.find(b'\n@@')
+            if hunks_start < 0:
+                # Binary, mode-only or empty change
+                continue
+            
+            if extensions or skip_ignored_files:
+                file_path = _unified_diff_path(file_diff[:hunks_start])
+                if skip_ignored_files and self._should_skip_file(file_path):
+                    continue
+                if extensions and not file_path.endswith(extensions):
+                    continue
+            
+            hunks = file_diff[hunks_start:]
+            additions += hunks.count(b'\n+')
+            deletions += hunks.count(b'\n-')
+        
+        return additions, deletions
+    
+    def _count_stash_diffs(self, diffs, extensions=None, skip_ignored_files=False):
+        """
+        Count added and removed lines in Stash/Bitbucket Server diff entries.
+        
+        Args:
+            diffs (iterable): The 'diffs' entries of a commit diff response
+            extensions (tuple): File extensions to include, or None for all
+            skip_ignored_files (bool): If True, also drop files _should_skip_file rejects
+            
+        Returns:
+            tuple: (additions, deletions)
+        """
+        additions = 0
+        deletions = 0
+        for diff_file in diffs:
+            # Check file extension if specified
+            source = diff_file.get('source')
+            destination = diff_file.get('destination')
+            file_path = ''
+            
+            if source is not None:
+                file_path = source.get('toString', '')
+            elif destination is not None:
+                file_path = destination.get('toString', '')
+            
+            if skip_ignored_files and self._should_skip_file(file_path):
+                continue
                 
-                if source is not None:
-                    file_path = source.get('toString', '')
-                elif destination is not None:
-                    file_path = destination.get('toString', '')
-                    
-                if file_extensions and not any(file_path.endswith(ext) for ext in file_extensions):
+            if extensions and not file_path.endswith(extensions):
+                continue
+            
+            # Process each file's hunks - optimized to count lines in one pass
+            for hunk in diff_file.get('hunks', []):
+                for segment in hunk.get('segments', []):
+                    segment_type = segment.get('type')
+                    if segment_type == 'ADDED':
+                        lines = segment.get('lines')
+                        if lines:
+                            additions += len(lines)
+                    elif segment_type == 'REMOVED':
+                        lines = segment.get('lines')
+                        if lines:
+                            deletions += len(lines)
+        
+        return additions, deletions
+    
+    def _stream_stash_diff_stats(self, url, extensions=None, skip_ignored_files=False):
+        """
+        Count a Stash/Bitbucket Server commit diff while it downloads.
+        
+        ijson yields one file's diff at a time, so memory stays bounded by the
+        largest file rather than the whole response. The response is not put
+        in the API caches; the per-commit result is cached by the caller.
+        
+        Args:
+            url (str): The commit's diff endpoint
+            extensions (tuple): File extensions to include, or None for all
+            skip_ignored_files (bool): If True, also drop files _should_skip_file rejects
+            
+        Returns:
+            tuple: (additions, deletions), or None if the request failed
+        """
+        try:
+            self._throttle()
+            with self.session.get(url, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                # Let urllib3 undo any gzip/deflate transfer encoding
+                response.raw.decode_content = True
+                return self._count_stash_diffs(ijson.items(response.raw, 'diffs.item'), extensions,
+                                               skip_ignored_files)
+        except (requests.exceptions.RequestException, ijson.JSONError) as e:
+            print(f"Failed to stream diff {url}: {e}")
+            return None
+    
+    def _get_commit_info(self, workspace, repo_slug, commit_hash, commit=None):
+        """
+        Get a single commit's details, including its parents.
+        
+        Commits listed by get_commits already carry their parents, so those
+        are used as-is. Otherwise the commit is requested; all the stats
+        methods go through here, so within an analyze_repository call the
+        commit-info memo answers the repeated lookups a fallback from cloc
+        to the diff API makes.
+        
+        Args:
+            workspace (str): Bitbucket workspace or project key
+            repo_slug (str): Repository slug
+            commit_hash (str): Commit hash
+            commit (dict): The commit as listed by get_commits, if already fetched
+            
+        Returns:
+            dict: The commit's JSON, or None if the request failed
+        """
+        if commit is not None and 'parents' in commit:
+            return commit
+        
+        url = self._commit_url(workspace, repo_slug, commit_hash)
+        memo = _commit_info_memo.get()
+        commit_info = memo.get(url) if memo is not None else None
+        if commit_info is None:
+            commit_info = self._make_request(url)
+            # Failed lookups are not remembered, so a later call retries them
+            if commit_info and memo is not None:
+                memo.set(url, commit_info)
+        return commit_info
+    
+    def _stash_commit_url(self, workspace, repo_slug, commit_hash):
+        return f"{self.api_base}/rest/api/1.0/projects/{workspace}/repos/{repo_slug}/commits/{commit_hash}"
+    
+    def _cloud_commit_url(self, workspace, repo_slug, commit_hash):
+        return f"{self.api_base}/repositories/{workspace}/{repo_slug}/commit/{commit_hash}"
+    
+    def _stash_archive_url(self, workspace, repo_slug, commit_hash):
+        return f"{self.api_base}/rest/api/1.0/projects/{workspace}/repos/{repo_slug}/archive?at={commit_hash}"
+    
+    def _cloud_archive_url(self, workspace, repo_slug, commit_hash):
+        return f"{self.api_base}/repositories/{workspace}/{repo_slug}/src/{commit_hash}"
+    
+    def _stash_raw_file_url(self, workspace, repo_slug, commit_hash, path):
+        return (f"{self.api_base}/rest/api/1.0/projects/{workspace}/repos/{repo_slug}/raw/{quote(path)}"
+                f"?at={commit_hash}")
+    
+    def _cloud_raw_file_url(self, workspace, repo_slug, commit_hash, path):
+        return f"{self.api_base}/repositories/{workspace}/{repo_slug}/src/{commit_hash}/{quote(path)}"
+    
+    def _stash_changed_paths(self, workspace, repo_slug, commit_hash, parent_hash):
+        """
+        List the paths a Stash/Bitbucket Server commit changed.
+        
+        Args:
+            workspace (str): Project key
+            repo_slug (str): Repository slug
+            commit_hash (str): Commit hash
+            parent_hash (str): Hash of the parent the changes are taken against
+            
+        Returns:
+            list: Old and new paths of every changed file, or None if the
+                request failed or more than SPARSE_CLOC_MAX_FILES changed
+        """
+        url = f"{self._stash_commit_url(workspace, repo_slug, commit_hash)}/changes"
+        response_json = self._make_request(url, {'since': parent_hash, 'limit': SPARSE_CLOC_MAX_FILES})
+        if not response_json or not response_json.get('isLastPage', True):
+            return None
+        
+        paths = []
+        for change in response_json.get('values', []):
+            for key in ('path', 'srcPath'):
+                path = (change.get(key) or {}).get('toString')
+                if path:
+                    paths.append(path)
+        return paths
+    
+    def _cloud_changed_paths(self, workspace, repo_slug, commit_hash, parent_hash):
+        """
+        List the paths a Bitbucket Cloud commit changed.
+        
+        Takes the same arguments and returns the same list as
+        _stash_changed_paths; the diffstat is always against the first parent.
+        """
+        url = f"{self.api_base}/repositories/{workspace}/{repo_slug}/diffstat/{commit_hash}"
+        response_json = self._make_request(url, {'pagelen': SPARSE_CLOC_MAX_FILES})
+        if not response_json or 'next' in response_json:
+            return None
+        
+        paths = []
+        for file in response_json.get('values', []):
+            for key in ('old', 'new'):
+                path = (file.get(key) or {}).get('path')
+                if path:
+                    paths.append(path)
+        return paths
+    
+    def _stats_cache_key(self, method, workspace, repo_slug, commit_hash, file_extensions=None):
+        """Key of a commit's line counts in the stats cache
+        
+        The counting method is part of the key because cloc, the diff API
+        and git numstat count lines differently.
+        """
+        extensions = ','.join(sorted(file_extensions or []))
+        return f"{method}|{self.base_url}|{workspace}/{repo_slug}|{commit_hash}|{extensions}"
+    
+    def _clone_url(self, workspace, repo_slug):
+        """Git URL of the repository on the server"""
+        if self.is_stash:
+            return f"{self.base_url}/scm/{workspace}/{repo_slug}.git"
+        return f"https://bitbucket.org/{workspace}/{repo_slug}.git"
+    
+    def _git(self, *args, input=None):
+        """
+        Run a git command with the analyzer's Authorization header.
+        
+        The header is passed through GIT_CONFIG_* environment variables so
+        the token never appears on the command line or in the clone's config.
+        """
+        env = dict(os.environ,
+                   GIT_TERMINAL_PROMPT='0',
+                   GIT_CONFIG_COUNT='1',
+                   GIT_CONFIG_KEY_0='http.extraHeader',
+                   GIT_CONFIG_VALUE_0=f"Authorization: {self.headers['Authorization']}")
+        return subprocess.run(['git', *args], input=input, env=env,
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    
+    def _local_clone_dir(self, workspace, repo_slug):
+        """Directory of the repository's persistent bare clone, next to the commit stats cache"""
+        host = urlsplit(self._clone_url(workspace, repo_slug)).netloc.replace(':', '_')
+        return os.path.join(self.stats_cache.cache_dir, 'clones', host, workspace, f"{repo_slug}.git")
+    
+    def _ensure_local_clone(self, workspace, repo_slug):
+        """
+        Return the path of a bare clone of the repository, creating it on first
+        use and fetching new commits into it afterwards.
+        
+        The clone persists across runs and processes under the stats cache
+        directory, so only the first analysis of a repository pays for the
+        full clone.
+        
+        Args:
+            workspace (str): Bitbucket workspace or project key
+            repo_slug (str): Repository slug
+            
+        Returns:
+            str: Path of the bare clone, or None if git is missing or the clone failed
+        """
+        if not shutil.which('git'):
+            return None
+        
+        clone_dir = self._local_clone_dir(workspace, repo_slug)
+        with _clone_locks_lock:
+            lock = _clone_locks.setdefault(clone_dir, threading.Lock())
+        with lock:
+            if os.path.isdir(clone_dir):
+                try:
+                    self._git('-C', clone_dir, 'fetch', '--quiet', 'origin', '+refs/heads/*:refs/heads/*')
+                except (subprocess.SubprocessError, OSError) as e:
+                    # Commits the stale clone lacks are left to the API
+                    print(f"Could not update the clone of {workspace}/{repo_slug}: {e}")
+                return clone_dir
+            
+            temp_dir = None
+            try:
+                # Cloned beside its final place and renamed in, so another
+                # process never sees a half-written clone
+                os.makedirs(os.path.dirname(clone_dir), exist_ok=True)
+                temp_dir = tempfile.mkdtemp(prefix=f"{repo_slug}-", suffix='.tmp', dir=os.path.dirname(clone_dir))
+                print(f"Cloning {workspace}/{repo_slug} for local commit statistics")
+                self._git('clone', '--bare', '--quiet', self._clone_url(workspace, repo_slug), temp_dir)
+                try:
+                    os.rename(temp_dir, clone_dir)
+                except OSError:
+                    # Another process finished its clone first
+                    if not os.path.isdir(clone_dir):
+                        raise
+            except (subprocess.SubprocessError, OSError) as e:
+                stderr = getattr(e, 'stderr', None) or b''
+                print(f"Could not clone {workspace}/{repo_slug}: {e} {stderr.decode('utf-8', 'replace').strip()}")
+                return None
+            finally:
+                if temp_dir and os.path.isdir(temp_dir):
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+        return clone_dir
+    
+    def bulk_commit_stats(self, workspace, repo_slug, commit_hashes, file_extensions=None):
+        """
+        Get additions and deletions for many commits with one local git log.
+        
+        Counts follow get_loc_changes: merge commits count as zero, and files
+        rejected by _should_skip_file or file_extensions are ignored. Renamed
+        files are matched on their old path, as the diff API reports them.
+        
+        Args:
+            workspace (str): Bitbucket workspace or project key
+            repo_slug (str): Repository slug
+            commit_hashes (list): Hashes of the commits to measure
+            file_extensions (list): List of file extensions to include (e.g., ['.py', '.js'])
+            
+        Returns:
+            dict: Commit hash -> {'additions', 'deletions'}, or None if the
+                repository could not be read locally
+        """
+        stats = {}
+        uncached = []
+        for commit_hash in commit_hashes:
+            cached = self.stats_cache.get(
+                self._stats_cache_key('numstat', workspace, repo_slug, commit_hash, file_extensions))
+            if cached is not None:
+                stats[commit_hash] = cached
+            else:
+                uncached.append(commit_hash)
+        
+        # Every commit measured on an earlier run: no clone needed
+        if not uncached:
+            return stats
+        
+        clone_dir = self._ensure_local_clone(workspace, repo_slug)
+        if not clone_dir:
+            return stats or None
+        
+        try:
+            # Commits missing from the clone are left to the API (--ignore-missing
+            # must come before --stdin to apply to the hashes read from it)
+            result = self._git('-C', clone_dir, 'log', '--ignore-missing', '--no-walk=unsorted', '--stdin',
+                               '--numstat', '-z', '--format=%x01%H',
+                               input='\n'.join(uncached).encode())
+        except (subprocess.SubprocessError, OSError) as e:
+            print(f"git log failed for {workspace}/{repo_slug}: {e}")
+            return stats or None
+        
+        extensions = tuple(file_extensions) if file_extensions else None
+        # Each commit is \x01<hash>\0 followed by NUL-terminated numstat
+        # entries "added\tdeleted\tpath"; renames leave the path empty and
+        # append the old and new paths as two more fields
+        for record in result.stdout.decode('utf-8', 'replace').split('\x01')[1:]:
+            commit_hash, _, numstat = record.partition('\0')
+            fields = numstat.lstrip('\n').split('\0')
+            additions = deletions = 0
+            i = 0
+            while i < len(fields):
+                parts = fields[i].split('\t')
+                i += 1
+                if len(parts) != 3:
                     continue
+                added, removed, file_path = parts
+                if not file_path:
+                    file_path = fields[i]
+                    i += 2
                 
-                # Process each file's hunks
-                for hunk in diff_file.get('hunks', []):
-                    for segment in hunk.get('segments', []):
-                        if segment.get('type') == 'ADDED':
-                            additions += len(segment.get('lines', []))
-                        elif segment.get('type') == 'REMOVED':
-                            deletions += len(segment.get('lines', []))
-        else:
-            # Bitbucket Cloud format
-            for file in response_json.get('values', []):
-                # Filter by file extension if specified
-                file_path = file.get('new', {}).get('path', '') or file.get('old', {}).get('path', '')
-                if file_extensions and not any(file_path.endswith(ext) for ext in file_extensions):
+                if self._should_skip_file(file_path):
                     continue
-                    
-                # Add up additions and deletions from each file
-                additions += file.get('lines_added', 0)
-                deletions += file.get('lines_removed', 0)
+                if extensions and not file_path.endswith(extensions):
+                    continue
+                
+                # Binary files report "-" for both counts
+                if added != '-':
+                    additions += int(added)
+                    deletions += int(removed)
+            
+            stats[commit_hash] = {'additions': additions, 'deletions': deletions}
+            self.stats_cache.set(self._stats_cache_key('numstat', workspace, repo_slug, commit_hash, file_extensions),
+                                 stats[commit_hash])
         
-        return {
-            'additions': additions,
-            'deletions': deletions
-        }
+        return stats
     
+    @_scoped_commit_info_memo
     def analyze_repository(self, workspace, repo_slug, start_date=None, end_date=None, group_by='day', 
                           file_extensions=None, ignore_merges=False, include_merges=False, by_user=False, 
-                          focus_user=None):
+                          focus_user=None, max_workers=5, use_cloc=False, commit_counts=False,
+                          bulk_stats=True):
         """
         Analyze repository for lines added and deleted over time.
         
@@ -451,6 +1304,13 @@ class BitbucketLOCAnalyzer:
             include_merges (bool): If True, include merge commits (overrides ignore_merges)
             by_user (bool): If True, include user information in the results
             focus_user (str): If provided, only analyze commits by this user (case insensitive, partial match)
+            max_workers (int): Maximum number of commits fetched concurrently
+            use_cloc (bool): If True, count lines with cloc on each commit's archive
+                and its parent's instead of the server's diff statistics (much slower)
+            commit_counts (bool): If True, add a 'commits' column with the number
+                of commits counted in each period
+            bulk_stats (bool): If True, read the stats of large histories from a
+                local bare clone (see bulk_commit_stats) instead of the diff API
             
         Returns:
             DataFrame: DataFrame with dates and line changes
@@ -512,8 +1372,15 @@ class BitbucketLOCAnalyzer:
                 if author_date != committer_date:
                     print(f"Commit {commit_hash[:8]}: (author: {author_date}, committer: {committer_date})")
                     
+        # Large histories are measured from one local clone; anything it
+        # cannot answer falls back to the per-commit API requests
+        commit_stats = None
+        if bulk_stats and len(commits) > BULK_STATS_MIN_COMMITS and not use_cloc:
+            commit_hashes = [commit[self._hash_field] for commit in commits]
+            commit_stats = self.bulk_commit_stats(workspace, repo_slug, commit_hashes, file_extensions)
+        
         # Process commits in parallel with optimized settings
-        data, user_data = self.analyze_commits_parallel(
+        daily_totals, user_data = self.analyze_commits_parallel(
             commits=commits,
             workspace=workspace,
             repo_slug=repo_slug,
@@ -522,67 +1389,49 @@ class BitbucketLOCAnalyzer:
             ignore_merges=ignore_merges,
             include_merges=include_merges,
             by_user=by_user,
-            max_workers=5  # Reduced from 10 to prevent overwhelming the API
+            max_workers=max_workers,
+            commit_stats=commit_stats,
+            use_cloc=use_cloc
         )
         
         if focus_user:
-            if data:
-                print(f"Processed {len(data)} commits from user matching '{focus_user}'")
+            if daily_totals:
+                processed = sum(commit_count for _, _, commit_count in daily_totals.values())
+                print(f"Processed {processed} commits from user matching '{focus_user}'")
             else:
                 print(f"No commits found from user matching '{focus_user}'")
             
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
-        
-        # Group by date
-        if not df.empty:
-            if group_by == 'day':
-                df['date'] = pd.to_datetime(df['date'])
-            elif group_by == 'week':
-                df['date'] = pd.to_datetime(df['date'])
-                df['date'] = df['date'] - pd.to_timedelta(df['date'].dt.dayofweek, unit='D')
-            elif group_by == 'month':
-                df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-01')
-                df['date'] = pd.to_datetime(df['date'])
-            
-            grouped = df.groupby('date').agg({
-                'additions': 'sum',
-                'deletions': 'sum'
-            }).reset_index()
-            
-            # Sort by date
-            grouped = grouped.sort_values('date')
-        else:
-            # Create an empty DataFrame with the right columns if no data
-            grouped = pd.DataFrame(columns=['date', 'additions', 'deletions'])
+        # Commits arrive already summed per day, so the frame has one row per
+        # active day (sorted, as the keys are YYYY-MM-DD strings)
+        value_columns = ['additions', 'deletions', 'commits'] if commit_counts else ['additions', 'deletions']
+        grouped = pd.DataFrame(
+            [(date, *totals[:len(value_columns)]) for date, totals in sorted(daily_totals.items())],
+            columns=['date', *value_columns]
+        )
+        
+        if not grouped.empty:
+            # Parse the dates once with an explicit format, then snap weeks
+            # (to Monday) and months with datetime ops and merge those days
+            grouped['date'] = pd.to_datetime(grouped['date'], format='%Y-%m-%d')
+            if group_by in ('week', 'month'):
+                period = 'W' if group_by == 'week' else 'M'
+                grouped['date'] = grouped['date'].dt.to_period(period).dt.start_time
+                grouped = grouped.groupby('date', as_index=False)[value_columns].sum()
         
         # Calculate user statistics if requested
         if by_user and user_data:
-            # Process user data
-            user_stats = []
-            for name, stats in user_data.items():
-                user_stats.append({
-                    'name': name,
-                    'email': stats['email'],
-                    'commits': stats['commits'],
-                    'additions': stats['additions'],
-                    'deletions': stats['deletions'],
-                    'total_changes': stats['additions'] + stats['deletions']
-                })
-                
-            # Create DataFrame and sort by total changes
-            if user_stats:
-                user_df = pd.DataFrame(user_stats).sort_values('total_changes', ascending=False)
-                print(f"Generated user statistics for {len(user_df)} users")
-            else:
-                user_df = pd.DataFrame(columns=['name', 'email', 'commits', 'additions', 'deletions', 'total_changes'])
-                print("No user data was generated")
+            # The user statistics arrive as columns, so the frame and its
+            # total_changes column are built without a per-user loop
+            user_df = pd.DataFrame(user_data)
+            user_df['total_changes'] = user_df['additions'] + user_df['deletions']
+            user_df = user_df.sort_values('total_changes', ascending=False)
+            print(f"Generated user statistics for {len(user_df)} users")
                 
             return grouped, user_df
         
         return grouped
     
-    def visualize_changes(self, data, workspace, repo_slug, group_by='day'):
+    def visualize_changes(self, data, workspace, repo_slug, group_by='day', show=True):
         """
         Visualize code changes over time.
         
@@ -591,6 +1440,7 @@ class BitbucketLOCAnalyzer:
             workspace (str): Bitbucket workspace
             repo_slug (str): Repository slug
             group_by (str): How the data is grouped ('day', 'week', 'month')
+            show (bool): If False, leave the window for a later plt.show() call
             
         Returns:
             None
@@ -599,29 +1449,30 @@ class BitbucketLOCAnalyzer:
             print("No data to visualize")
             return
             
-        plt.figure(figsize=(12, 6))
+        fig, ax = plt.subplots(figsize=(12, 6))
+        dates = data['date'].to_numpy()
+        deletions = np.negative(data['deletions'].to_numpy())
         
         # Plot additions
-        plt.bar(data['date'], data['additions'], color='green', alpha=0.6, label='Additions')
+        ax.bar(dates, data['additions'].to_numpy(), color='green', alpha=0.6, label='Additions')
         
         # Plot deletions as negative values
-        plt.bar(data['date'], -data['deletions'], color='red', alpha=0.6, label='Deletions')
+        ax.bar(dates, deletions, color='red', alpha=0.6, label='Deletions')
         
         # Customize plot
-        plt.title(f'Code Changes in {workspace}/{repo_slug}')
-        plt.xlabel(f'Date (grouped by {group_by})')
-        plt.ylabel('Lines of Code')
-        plt.legend()
-        plt.grid(True, linestyle='--', alpha=0.7)
+        ax.set_title(f'Code Changes in {workspace}/{repo_slug}')
+        ax.set_xlabel(f'Date (grouped by {group_by})')
+        ax.set_ylabel('Lines of Code')
+        ax.legend()
+        ax.grid(True, linestyle='--', alpha=0.7)
         
         # Format dates on x-axis
-        plt.gcf().autofmt_xdate()
+        fig.autofmt_xdate()
         
         # Add summary statistics as text
-        total_additions = data['additions'].sum()
-        total_deletions = data['deletions'].sum()
+        total_additions, total_deletions = data[['additions', 'deletions']].sum()
         total_changes = total_additions + total_deletions
-        plt.figtext(
+        fig.text(
             0.5, 0.01, 
             f'Total changes: {total_changes} lines (Additions: {total_additions}, Deletions: {total_deletions})', 
             ha='center', 
@@ -630,12 +1481,16 @@ class BitbucketLOCAnalyzer:
         )
         
         # Save figure
-        plt.savefig(f'{workspace}_{repo_slug}_loc_changes.png', dpi=300, bbox_inches='tight')
+        fig.savefig(f'{workspace}_{repo_slug}_loc_changes.png', dpi=300, bbox_inches='tight')
         print(f"Visualization saved as '{workspace}_{repo_slug}_loc_changes.png'")
         
-        # Show plot
-        plt.tight_layout()
-        plt.show()
+        # Show plot; a headless backend has no window to show it in
+        if not _has_gui(fig):
+            plt.close(fig)
+            return
+        fig.tight_layout()
+        if show:
+            plt.show()
     
     def print_user_statistics(self, user_df, workspace, repo_slug):
         """
@@ -674,7 +1529,7 @@ class BitbucketLOCAnalyzer:
         print(f"Exported user summary to {user_summary_file}")
         
         # Generate user visualization
-        plt.figure(figsize=(12, 6))
+        fig = plt.figure(figsize=(12, 6))
         
         # Plot top users (up to 5)
         top_users = user_df.head(5)
@@ -690,8 +1545,12 @@ class BitbucketLOCAnalyzer:
         user_chart_file = f"{workspace}_{repo_slug}_user_stats.png"
         plt.savefig(user_chart_file, dpi=300, bbox_inches='tight')
         print(f"User visualization saved as '{user_chart_file}'")
+        
+        # Kept open for the caller's plt.show() only if there is a window to show
+        if not _has_gui(fig):
+            plt.close(fig)
     
-    def get_loc_changes_with_cloc(self, workspace, repo_slug, commit_hash, file_extensions=None):
+    def get_loc_changes_with_cloc(self, workspace, repo_slug, commit_hash, file_extensions=None, commit=None):
         """
         Get lines of code changes using cloc by comparing current commit with its parent.
         
@@ -700,32 +1559,31 @@ class BitbucketLOCAnalyzer:
             repo_slug (str): Repository slug
             commit_hash (str): Commit hash
             file_extensions (list): List of file extensions to include (e.g., ['.py', '.js'])
+            commit (dict): The commit as listed by get_commits, if already fetched
             
         Returns:
             dict: Dictionary with additions and deletions
         """
+        cache_key = self._stats_cache_key('cloc', workspace, repo_slug, commit_hash, file_extensions)
+        cached = self.stats_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Without cloc the archives below would be downloaded for nothing
+        if _cloc_path() is None:
+            return self.get_loc_changes(workspace, repo_slug, commit_hash, file_extensions, commit)
+        
         # First check if it's a merge commit by getting commit info
-        if self.is_stash:
-            url = f"{self.api_base}/rest/api/1.0/projects/{workspace}/repos/{repo_slug}/commits/{commit_hash}"
-        else:
-            url = f"{self.api_base}/repositories/{workspace}/{repo_slug}/commit/{commit_hash}"
-            
-        commit_info = self._make_request(url)
+        commit_info = self._get_commit_info(workspace, repo_slug, commit_hash, commit)
         
         # Skip merge commits (has more than one parent)
-        if commit_info:
-            parents = commit_info.get('parents', [])
-            if self.is_stash and len(parents) > 1:
-                return {'additions': 0, 'deletions': 0}
-            elif not self.is_stash and len(parents) > 1:
-                return {'additions': 0, 'deletions': 0}
+        if commit_info and len(commit_info.get('parents', [])) > 1:
+            return {'additions': 0, 'deletions': 0}
         
         # Get parent commit hash
         parent_hash = None
-        if self.is_stash and commit_info and commit_info.get('parents'):
-            parent_hash = commit_info['parents'][0]['id']
-        elif not self.is_stash and commit_info and commit_info.get('parents'):
-            parent_hash = commit_info['parents'][0]['hash']
+        if commit_info and commit_info.get('parents'):
+            parent_hash = commit_info['parents'][0][self._hash_field]
         
         if not parent_hash:
             print(f"Could not determine parent commit for {commit_hash}")
@@ -735,54 +1593,127 @@ class BitbucketLOCAnalyzer:
         with tempfile.TemporaryDirectory() as parent_dir, tempfile.TemporaryDirectory() as current_dir:
             try:
                 # Download parent commit files
-                if self.is_stash:
-                    parent_archive_url = f"{self.api_base}/rest/api/1.0/projects/{workspace}/repos/{repo_slug}/archive?at={parent_hash}"
-                    current_archive_url = f"{self.api_base}/rest/api/1.0/projects/{workspace}/repos/{repo_slug}/archive?at={commit_hash}"
-                else:
-                    parent_archive_url = f"{self.api_base}/repositories/{workspace}/{repo_slug}/src/{parent_hash}"
-                    current_archive_url = f"{self.api_base}/repositories/{workspace}/{repo_slug}/src/{commit_hash}"
+                parent_archive_url = self._archive_url(workspace, repo_slug, parent_hash)
+                current_archive_url = self._archive_url(workspace, repo_slug, commit_hash)
                 
-                # Download and extract archives for parent and current commit
-                self._download_and_extract(parent_archive_url, parent_dir)
-                self._download_and_extract(current_archive_url, current_dir)
+                # Most commits touch a handful of files, so fetching only
+                # those is far cheaper than two full archives
+                changed_paths = self._changed_paths(workspace, repo_slug, commit_hash, parent_hash)
+                if changed_paths is not None:
+                    self._download_changed_files(workspace, repo_slug, changed_paths, file_extensions,
+                                                 {parent_hash: parent_dir, commit_hash: current_dir})
+                else:
+                    # Download archives for parent and current commit; the two
+                    # downloads overlap instead of running back to back
+                    parent_download = self._download_pool.submit(self._download_archive, parent_archive_url)
+                    try:
+                        current_archive = self._download_archive(current_archive_url)
+                    finally:
+                        concurrent.futures.wait([parent_download])
+                    parent_archive = parent_download.result()
+                    
+                    # Files identical in both archives add nothing to cloc's diff,
+                    # so only the ones that differ are written to disk
+                    with parent_archive, current_archive, zipfile.ZipFile(parent_archive) as parent_zip, \
+                            zipfile.ZipFile(current_archive) as current_zip:
+                        parent_members, current_members = _changed_zip_members(parent_zip, current_zip)
+                        _extract_zip(parent_zip, parent_dir, parent_members)
+                        _extract_zip(current_zip, current_dir, current_members)
                 
                 # Run cloc to get statistics
-                result = self._run_cloc_comparison(parent_dir, current_dir, file_extensions)
+                stats = self._run_cloc_comparison(parent_dir, current_dir, file_extensions)
+                if stats is None:
+                    raise RuntimeError("cloc comparison failed")
                 
-                return {
-                    'additions': result['added'],
-                    'deletions': result['removed']
-                }
+                self.stats_cache.set(cache_key, stats)
+                return stats
                 
             except Exception as e:
                 print(f"Error using cloc for LOC calculation: {e}")
                 # Fallback to the traditional method
                 print("Falling back to traditional diff method")
-                return self.get_loc_changes(workspace, repo_slug, commit_hash, file_extensions)
+                return self.get_loc_changes(workspace, repo_slug, commit_hash, file_extensions, commit)
                 
-    def _download_and_extract(self, url, target_dir):
+    def _download_archive(self, url):
         """
-        Download and extract repository archive from Bitbucket.
+        Download a repository archive from Bitbucket.
+        
+        Small archives never touch the disk; large ones spill over to a
+        temporary file.
         
         Args:
             url (str): URL to download the archive
-            target_dir (str): Directory to extract the archive to
-        """
-        # Use temp file to store the archive
-        with tempfile.NamedTemporaryFile(suffix='.zip') as tmp_file:
-            # Download archive
-            response = requests.get(url, headers=self.headers, stream=True)
-            response.raise_for_status()
             
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    tmp_file.write(chunk)
-                    
-            tmp_file.flush()
-            
-            # Extract archive
-            shutil.unpack_archive(tmp_file.name, target_dir, format='zip')
+        Returns:
+            SpooledTemporaryFile: The archive, rewound; the caller closes it
+        """
+        archive = tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_BYTES)
+        try:
+            self._throttle()
+            with self.session.get(url, stream=True, timeout=60) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                    archive.write(chunk)
+        except BaseException:
+            archive.close()
+            raise
+        
+        archive.seek(0)
+        return archive
+            
+    def _download_changed_files(self, workspace, repo_slug, paths, file_extensions, target_dirs):
+        """
+        Fetch the given files at each revision into that revision's directory.
+        
+        Files that do not exist at a revision (added or deleted by the
+        commit) are left out of its directory, which is how cloc sees an
+        added or removed file in the full archives as well.
+        
+        Args:
+            workspace (str): Bitbucket workspace or project key
+            repo_slug (str): Repository slug
+            paths (list): Repository paths of the changed files
+            file_extensions (list): List of file extensions to include, or None for all
+            target_dirs (dict): Directory to write each commit hash's files to
+        """
+        if file_extensions:
+            extensions = tuple(file_extensions)
+            paths = [path for path in paths if path.endswith(extensions)]
+        
+        downloads = []
+        for commit_hash, target_dir in target_dirs.items():
+            for path in set(paths):
+                # Same path sanitising as _extract_zip: no absolute or '..' parts
+                parts = [part for part in path.split('/') if part not in ('', '.', '..')]
+                if parts:
+                    downloads.append((self._raw_file_url(workspace, repo_slug, commit_hash, path),
+                                      os.path.join(target_dir, *parts)))
+        
+        # list() re-raises the first download error
+        list(self._download_pool.map(lambda download: self._download_file(*download), downloads))
+    
+    def _download_file(self, url, target_path):
+        """
+        Download a single raw file from Bitbucket.
+        
+        Args:
+            url (str): URL of the file's raw contents
+            target_path (str): Where to write the file
             
+        Returns:
+            bool: True if the file was written, False if it does not exist at that revision
+        """
+        self._throttle()
+        with self.session.get(url, stream=True, timeout=60) as response:
+            if response.status_code == 404:
+                return False
+            response.raise_for_status()
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            with open(target_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                    f.write(chunk)
+        return True
+    
     def _run_cloc_comparison(self, dir1, dir2, file_extensions=None):
         """
         Run cloc to compare two directories.
@@ -793,23 +1724,22 @@ class BitbucketLOCAnalyzer:
             file_extensions (list): List of file extensions to include
             
         Returns:
-            dict: Dictionary with added, removed, and modified lines
+            dict: Dictionary with additions and deletions, or None if cloc failed
         """
         try:
             # Check if cloc is installed
-            subprocess.run(['cloc', '--version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-            
-            # Build file extension filter
-            ext_filter = []
-            if file_extensions:
-                ext_filter = ['--include-ext=' + ','.join(ext.lstrip('.') for ext in file_extensions)]
+            cloc = _cloc_path()
+            if cloc is None:
+                raise FileNotFoundError("cloc is not installed")
             
             # Run cloc on both directories
-            cmd = ['cloc', '--diff', dir1, dir2, '--json'] + ext_filter
-            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
+            cmd = ([cloc, '--diff', dir1, dir2, '--json', '--quiet'] + _cloc_process_args()
+                   + _cloc_extension_args(tuple(file_extensions or ())))
+            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
             
-            # Parse JSON output
-            data = json.loads(result.stdout)
+            # Parse the JSON output as bytes; decoding it to str first would
+            # only copy it again before parsing
+            data = _json_loads(result.stdout)
             
             # Extract summary
             same_files_modified = data.get('SUM', {}).get('same', {})
@@ -840,8 +1770,8 @@ class BitbucketLOCAnalyzer:
         except (subprocess.SubprocessError, json.JSONDecodeError, FileNotFoundError) as e:
             print(f"Error running cloc: {e}")
             # If there's an error with cloc or parsing its output,
-            # return zeros to let the caller know it didn't work
-            return {'added': 0, 'removed': 0}
+            # let the caller know it didn't work
+            return None
     
     def _make_request(self, url, params=None):
         """
@@ -857,7 +1787,7 @@ class BitbucketLOCAnalyzer:
         # Try to get from cache first
         cached_data = self.cache.get(url, params)
         if cached_data:
-            print(f"Using cached response for: {url}")
+            logger.debug("Using cached response for: %s", url)
             return cached_data
             
         try:
@@ -866,31 +1796,47 @@ class BitbucketLOCAnalyzer:
             # proper certificates rather than disabling verification.
             verify = True
             
-            print(f"Making request to: {url}")
-            print(f"Headers: {self.headers}")
-            print(f"Parameters: {params}")
-            
-            # Always use Bearer token authentication
-            print("Using Bearer token authentication")
-            response = requests.get(url, headers=self.headers, params=params, verify=verify, timeout=30)
-            
-            print(f"Response status code: {response.status_code}")
-            print(f"Response headers: {response.headers}")
-            
-            # Print the first 500 characters of the response for debugging
-            response_preview = response.text[:500] + "..." if len(response.text) > 500 else response.text
-            print(f"Response preview: {response_preview}")
+            # An expired cache entry is revalidated rather than refetched;
+            # an unchanged resource comes back as an empty 304
+            stale_data, validators = self.cache.get_stale(url, params)
+            conditional_headers = {}
+            if stale_data is not None:
+                if 'ETag' in validators:
+                    conditional_headers['If-None-Match'] = validators['ETag']
+                if 'Last-Modified' in validators:
+                    conditional_headers['If-Modified-Since'] = validators['Last-Modified']
+            
+            # Per-request details are debug logging only; the token is in the
+            # session headers, so they are never printed
+            logger.debug("Making request to: %s with parameters: %s", url, params)
+            self._throttle()
+            response = self.session.get(url, params=params, headers=conditional_headers, verify=verify,
+                                        timeout=30)
+            
+            if response.status_code == 304 and conditional_headers:
+                logger.debug("Not modified, reusing cached response for: %s", url)
+                self.cache.set(url, params, stale_data, validators)
+                return stale_data
+            
+            if logger.isEnabledFor(logging.DEBUG):
+                # The preview decodes the body, so only build it when it is logged
+                logger.debug("Response status code: %s, headers: %s", response.status_code, response.headers)
+                response_preview = response.text[:500] + "..." if len(response.text) > 500 else response.text
+                logger.debug("Response preview: %s", response_preview)
                 
             # Check for HTTP errors
             response.raise_for_status()
             
             # Only try to parse as JSON if we got content and it's JSON content
-            if response.text.strip():
+            body = response.content.strip()
+            if body:
                 content_type = response.headers.get('Content-Type', '')
-                if 'json' in content_type or response.text.strip().startswith('{'):
-                    response_data = response.json()
-                    # Cache the successful response
-                    self.cache.set(url, params, response_data)
+                if 'json' in content_type or body.startswith(b'{'):
+                    response_data = _json_loads(response.content)
+                    # Cache the successful response, with what is needed to revalidate it
+                    validators = {name: response.headers[name] for name in ('ETag', 'Last-Modified')
+                                  if name in response.headers}
+                    self.cache.set(url, params, response_data, validators)
                     return response_data
                 else:
                     print(f"Warning: Response is not JSON. Content-Type: {content_type}")
@@ -945,28 +1891,9 @@ class BitbucketLOCAnalyzer:
             bool: True if file should be skipped
         """
         # Skip binary files, generated code, etc.
-        skip_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.ico', '.bmp', '.tiff',  
-                           '.zip', '.tar', '.gz', '.rar', '.7z', '.jar', '.war', '.ear', 
-                           '.class', '.pyc', '.pyo', '.o', '.obj', '.dll', '.exe', '.so', '.dylib',
-                           '.min.js', '.min.css', '.pdf', '.doc', '.docx', '.ppt', '.pptx',
-                           '.xls', '.xlsx', '.svg', '.ttf', '.woff', '.woff2', '.eot',
-                           '.mp3', '.mp4', '.avi', '.mov', '.flv', '.webm', '.lock']
-                           
-        skip_paths = ['node_modules/', 'dist/', 'build/', 'target/', '__pycache__/', 
-                      '.git/', '.svn/', '.idea/', '.vscode/', '.gradle/', 
-                      'vendor/', 'bin/', 'obj/']
-        
-        # Check extensions
-        if any(filepath.lower().endswith(ext) for ext in skip_extensions):
-            return True
-            
-        # Check paths
-        if any(path in filepath for path in skip_paths):
-            return True
-            
-        return False
+        return filepath.lower().endswith(SKIP_EXTENSIONS) or SKIP_PATH_PATTERN.search(filepath) is not None
         
-    def get_loc_changes(self, workspace, repo_slug, commit_hash, file_extensions=None):
+    def get_loc_changes(self, workspace, repo_slug, commit_hash, file_extensions=None, commit=None):
         """
         Get commit statistics (additions and deletions) with optimized calculation.
         
@@ -975,87 +1902,33 @@ class BitbucketLOCAnalyzer:
             repo_slug (str): Repository slug
             commit_hash (str): Commit hash
             file_extensions (list): List of file extensions to include (e.g., ['.py', '.js'])
+            commit (dict): The commit as listed by get_commits, if already fetched
             
         Returns:
             dict: Dictionary with additions and deletions
         """
-        if self.is_stash:
-            # First check if it's a merge commit by getting commit info
-            url = f"{self.api_base}/rest/api/1.0/projects/{workspace}/repos/{repo_slug}/commits/{commit_hash}"
-            commit_info = self._make_request(url)
-            
-            # Skip merge commits (has more than one parent)
-            if commit_info and len(commit_info.get('parents', [])) > 1:
-                return {'additions': 0, 'deletions': 0}
-            
-            # For Stash/Bitbucket Server - get detailed diff information for more accurate counts
-            url = f"{self.api_base}/rest/api/1.0/projects/{workspace}/repos/{repo_slug}/commits/{commit_hash}/diff"
-        else:
-            # For Bitbucket Cloud
-            url = f"{self.api_base}/repositories/{workspace}/{repo_slug}/diffstat/{commit_hash}"
-        
-        # Make the request using our helper method
-        response_json = self._make_request(url)
-        
-        if not response_json:
+        cache_key = self._stats_cache_key('diff', workspace, repo_slug, commit_hash, file_extensions)
+        cached = self.stats_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # str.endswith takes a tuple and checks every extension in C
+        extensions = tuple(file_extensions) if file_extensions else None
+        
+        # Skip binary files as well as checking extensions
+        counts = self._fetch_diff_stats(workspace, repo_slug, commit_hash, extensions,
+                                        skip_ignored_files=True, commit=commit)
+        if counts is None:
             # If request failed, return zeros
             return {'additions': 0, 'deletions': 0}
         
-        # Calculate additions and deletions from diff statistics
-        additions = 0
-        deletions = 0
-        
-        if self.is_stash:
-            # Stash/Bitbucket Server format - improved processing
-            for diff_file in response_json.get('diffs', []):
-                # Check file extension if specified
-                source = diff_file.get('source')
-                destination = diff_file.get('destination')
-                file_path = ''
-                
-                if source is not None:
-                    file_path = source.get('toString', '')
-                elif destination is not None:
-                    file_path = destination.get('toString', '')
-                
-                # Skip binary files and check extensions
-                if self._should_skip_file(file_path):
-                    continue
-                    
-                if file_extensions and not any(file_path.endswith(ext) for ext in file_extensions):
-                    continue
-                
-                # Process each file's hunks - optimized to count lines in one pass
-                for hunk in diff_file.get('hunks', []):
-                    for segment in hunk.get('segments', []):
-                        segment_type = segment.get('type')
-                        lines_count = len(segment.get('lines', []))
-                        
-                        if segment_type == 'ADDED':
-                            additions += lines_count
-                        elif segment_type == 'REMOVED':
-                            deletions += lines_count
-        else:
-            # Bitbucket Cloud format - optimized processing
-            for file in response_json.get('values', []):
-                # Get file path
-                file_path = file.get('new', {}).get('path', '') or file.get('old', {}).get('path', '')
-                
-                # Skip binary files and check extensions
-                if self._should_skip_file(file_path):
-                    continue
-                    
-                if file_extensions and not any(file_path.endswith(ext) for ext in file_extensions):
-                    continue
-                    
-                # Add up additions and deletions from each file
-                additions += file.get('lines_added', 0)
-                deletions += file.get('lines_removed', 0)
-        
-        return {
-            'additions': additions,
-            'deletions': deletions
+        stats = {
+            'additions': counts[0],
+            'deletions': counts[1]
         }
+        # Only successful lookups are cached; failed requests return zeros above
+        self.stats_cache.set(cache_key, stats)
+        return stats
     
     def normalize_username(self, username):
         """
@@ -1224,7 +2097,8 @@ class BitbucketLOCAnalyzer:
         return False
     
     def _process_single_commit(self, commit, workspace, repo_slug, file_extensions=None, 
-                           focus_user=None, ignore_merges=False, include_merges=False, by_user=False):
+                           focus_user=None, ignore_merges=False, include_merges=False, by_user=False,
+                           commit_stats=None, use_cloc=False):
         """
         Process a single commit and return its data.
         
@@ -1237,64 +2111,38 @@ class BitbucketLOCAnalyzer:
             ignore_merges (bool): If True, ignore merge commits
             include_merges (bool): If True, include merge commits
             by_user (bool): If True, include user information
+            commit_stats (dict): Precomputed stats by commit hash, from bulk_commit_stats
+            use_cloc (bool): If True, count lines with cloc instead of the diff API
             
         Returns:
             dict: Processed commit data or None if commit should be skipped
         """
-        if self.is_stash:
-            # Stash/Bitbucket Server format
-            commit_hash = commit['id']
-            
-            # Get both author and committer timestamps (Unix epoch milliseconds)
-            author_timestamp_ms = commit.get('authorTimestamp', 0)
-            committer_timestamp_ms = commit.get('committerTimestamp', author_timestamp_ms)
-            
-            # Use the later of the two timestamps
-            timestamp_ms = max(author_timestamp_ms, committer_timestamp_ms)
-            commit_date = datetime.fromtimestamp(timestamp_ms / 1000).strftime('%Y-%m-%d')
-            
-            # Get author information for user-level stats
-            author_name = commit.get('author', {}).get('displayName', 'Unknown')
-            author_email = commit.get('author', {}).get('emailAddress', '')
-            
-            # Filter by user if focus_user is provided
-            if focus_user and not self.is_user_match(author_name, focus_user):
-                return None
-            
-            # Handle merge commits based on flags
-            is_merge = commit.get('message', '').startswith('Merge ')
-            if is_merge and ignore_merges and not include_merges:
-                return None
+        if self.should_stop and self.should_stop():
+            return None
+        
+        commit_hash, commit_date, author_name, author_email = self._commit_fields(commit)
+        
+        # Filter by user if focus_user is provided
+        if focus_user and not self.is_user_match(author_name, focus_user):
+            return None
+        
+        # Handle merge commits based on flags; the listed commit carries its
+        # parents, which unlike the message cannot be reworded
+        is_merge = len(commit.get('parents', ())) > 1
+        if is_merge and ignore_merges and not include_merges:
+            return None
+        
+        if commit_stats and commit_hash in commit_stats:
+            stats = commit_stats[commit_hash]
+        elif use_cloc:
+            # Try to use cloc for LOC calculation, fall back to traditional method if it fails
+            try:
+                stats = self.get_loc_changes_with_cloc(workspace, repo_slug, commit_hash, file_extensions, commit)
+            except Exception:
+                stats = self.get_loc_changes(workspace, repo_slug, commit_hash, file_extensions, commit)
         else:
-            # Bitbucket Cloud format
-            commit_hash = commit['hash']
-            
-            # Parse both timestamps (if available)
-            author_date = parse(commit.get('date', '1970-01-01T00:00:00Z'))
-            committer_date = parse(commit.get('committer_date', commit.get('date', '1970-01-01T00:00:00Z')))
-            
-            # Use the later of the two timestamps
-            commit_date = max(author_date, committer_date).strftime('%Y-%m-%d')
-            
-            # Get author information for user-level stats
-            author_info = commit.get('author', {})
-            author_name = author_info.get('user', {}).get('display_name', 'Unknown')
-            author_email = author_info.get('raw', '').split('<')[-1].strip('>')
-            
-            # Filter by user if focus_user is provided
-            if focus_user and not self.is_user_match(author_name, focus_user):
-                return None
-                
-            # Handle merge commits based on flags
-            is_merge = commit.get('message', '').startswith('Merge ')
-            if is_merge and ignore_merges and not include_merges:
-                return None
-            
-        # Try to use cloc for LOC calculation, fall back to traditional method if it fails
-        try:
-            stats = self.get_loc_changes_with_cloc(workspace, repo_slug, commit_hash, file_extensions)
-        except Exception:
-            stats = self.get_loc_changes(workspace, repo_slug, commit_hash, file_extensions)
+            # The server's diff already has the line counts; no archives needed
+            stats = self.get_loc_changes(workspace, repo_slug, commit_hash, file_extensions, commit)
         
         # Prepare entry for time-series data
         entry = {
@@ -1310,9 +2158,57 @@ class BitbucketLOCAnalyzer:
             
         return entry
     
+    def _stash_commit_fields(self, commit):
+        """
+        Pull the fields the analysis needs out of a Stash/Bitbucket Server commit.
+        
+        Args:
+            commit (dict): Commit as listed by get_commits
+            
+        Returns:
+            tuple: (commit_hash, commit_date, author_name, author_email)
+        """
+        # Get both author and committer timestamps (Unix epoch milliseconds)
+        author_timestamp_ms = commit.get('authorTimestamp', 0)
+        committer_timestamp_ms = commit.get('committerTimestamp', author_timestamp_ms)
+        
+        # Use the later of the two timestamps
+        timestamp_ms = max(author_timestamp_ms, committer_timestamp_ms)
+        commit_date = _local_date(timestamp_ms // QUARTER_HOUR_MS)
+        
+        author = commit.get('author', {})
+        return commit['id'], commit_date, author.get('displayName', 'Unknown'), author.get('emailAddress', '')
+    
+    def _cloud_commit_fields(self, commit):
+        """
+        Pull the fields the analysis needs out of a Bitbucket Cloud commit.
+        
+        Args:
+            commit (dict): Commit as listed by get_commits
+            
+        Returns:
+            tuple: (commit_hash, commit_date, author_name, author_email)
+        """
+        if 'authorTimestamp' in commit:
+            # Already parsed by get_commits
+            timestamp_ms = max(commit['authorTimestamp'], commit['committerTimestamp'])
+        else:
+            # Parse both timestamps (if available) the way get_commits does
+            author_date = commit.get('date', '1970-01-01T00:00:00Z')
+            timestamp_ms = int(_iso_timestamps_ms([author_date, commit.get('committer_date', author_date)]).max())
+        
+        # Like Stash commits, the later of the two timestamps is bucketed by
+        # its local date, whatever UTC offset the commit was made in
+        commit_date = _local_date(timestamp_ms // QUARTER_HOUR_MS)
+        
+        author_info = commit.get('author', {})
+        author_name = author_info.get('user', {}).get('display_name', 'Unknown')
+        author_email = author_info.get('raw', '').split('<')[-1].strip('>')
+        return commit['hash'], commit_date, author_name, author_email
+    
     def analyze_commits_parallel(self, commits, workspace, repo_slug, file_extensions=None,
                               focus_user=None, ignore_merges=False, include_merges=False, 
-                              by_user=False, max_workers=10):
+                              by_user=False, max_workers=10, commit_stats=None, use_cloc=False):
         """
         Process commits in parallel for faster analysis.
         
@@ -1326,27 +2222,43 @@ class BitbucketLOCAnalyzer:
             include_merges (bool): If True, include merge commits
             by_user (bool): If True, include user information
             max_workers (int): Maximum number of worker threads
+            commit_stats (dict): Precomputed stats by commit hash, from bulk_commit_stats
+            use_cloc (bool): If True, count lines with cloc instead of the diff API
             
         Returns:
-            list: List of processed commit data
-            dict: User statistics if by_user is True
+            dict: [additions, deletions, commits] per commit date (YYYY-MM-DD)
+            dict: User statistics as columns (name, email, commits, additions,
+                deletions), one row per author; empty unless by_user is True
         """
-        results = []
-        user_data = {}
+        # Totals are accumulated as commits complete, so memory grows with the
+        # number of active days rather than the number of commits
+        daily_totals = defaultdict(lambda: [0, 0, 0])
+        processed_count = 0
         filtered_commit_count = 0
         total_commits = len(commits)
         
+        # Per-author counts (commits, additions, deletions) are kept as parallel
+        # columns indexed by author, so the user frame is built in one step.
+        # Each commit adds at most one author, which bounds the columns.
+        user_index = {}
+        user_names = []
+        user_emails = []
+        user_counts = np.zeros((3, total_commits if by_user else 0), dtype=np.int64)
+        
         print(f"Processing {total_commits} commits in parallel with {max_workers} workers")
         
-        # Use smaller batch size if there are fewer commits
-        workers = min(max_workers, max(1, total_commits // 5))
+        # The work is waiting on the network, so every commit can be in flight
+        # at once up to max_workers; no point starting more threads than commits
+        workers = min(max_workers, max(1, total_commits))
         
         # Create a progress bar
         with tqdm(total=total_commits, desc="Processing commits") as pbar:
             with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
-                # Submit all commits for processing
+                # Submit all commits for processing; each runs in a copy of
+                # this context so it sees the analysis' commit-info memo
                 future_to_commit = {
                     executor.submit(
+                        contextvars.copy_context().run,
                         self._process_single_commit, 
                         commit, 
                         workspace, 
@@ -1355,7 +2267,9 @@ class BitbucketLOCAnalyzer:
                         focus_user,
                         ignore_merges,
                         include_merges,
-                        by_user
+                        by_user,
+                        commit_stats,
+                        use_cloc
                     ): i for i, commit in enumerate(commits)
                 }
                 
@@ -1367,33 +2281,267 @@ class BitbucketLOCAnalyzer:
                     try:
                         entry = future.result()
                         if entry:
-                            results.append(entry)
+                            processed_count += 1
+                            totals = daily_totals[entry['date']]
+                            totals[0] += entry['additions']
+                            totals[1] += entry['deletions']
+                            totals[2] += 1
                             
                             # Update user statistics if requested
                             if by_user:
                                 author_name = entry['author']
-                                if author_name not in user_data:
-                                    user_data[author_name] = {
-                                        'name': author_name,
-                                        'email': entry['email'],
-                                        'commits': 0,
-                                        'additions': 0,
-                                        'deletions': 0
-                                    }
+                                idx = user_index.get(author_name)
+                                if idx is None:
+                                    idx = user_index[author_name] = len(user_names)
+                                    user_names.append(author_name)
+                                    user_emails.append(entry['email'])
                                 
-                                user_data[author_name]['commits'] += 1
-                                user_data[author_name]['additions'] += entry['additions']
-                                user_data[author_name]['deletions'] += entry['deletions']
+                                user_counts[:, idx] += (1, entry['additions'], entry['deletions'])
                         else:
                             filtered_commit_count += 1
                     except Exception as exc:
                         commit_id = commits[commit_index].get('id', commits[commit_index].get('hash', 'unknown'))
                         print(f"Error processing commit {commit_id}: {exc}")
         
-        print(f"Successfully processed {len(results)} commits, filtered {filtered_commit_count}")
+        print(f"Successfully processed {processed_count} commits, filtered {filtered_commit_count}")
+        
+        user_data = {}
+        if user_names:
+            commit_counts, additions, deletions = user_counts[:, :len(user_names)]
+            user_data = {
+                'name': user_names,
+                'email': user_emails,
+                'commits': commit_counts,
+                'additions': additions,
+                'deletions': deletions
+            }
+        
+        return dict(daily_totals), user_data
+    
+def _json_loads(data):
+    """Parse JSON from str or bytes, with orjson when it is installed"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj):
+    """Serialize obj to JSON bytes, with orjson when it is installed"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def _changed_zip_members(parent_zip, current_zip):
+    """
+    Find the members that differ between two archives of a repository.
+    
+    Compares the size and CRC-32 each zip records in its central
+    directory, so no file is decompressed to tell them apart.
+    
+    Args:
+        parent_zip (ZipFile): Archive of the parent commit
+        current_zip (ZipFile): Archive of the commit itself
         
-        return results, user_data
+    Returns:
+        tuple: Lists of the parent's and the commit's ZipInfo members that
+            are not identical in the other archive
+    """
+    parent_files = {info.filename: info for info in parent_zip.infolist() if not info.is_dir()}
+    current_files = {info.filename: info for info in current_zip.infolist() if not info.is_dir()}
+    unchanged = {name for name, info in current_files.items()
+                 if name in parent_files
+                 and (parent_files[name].CRC, parent_files[name].file_size) == (info.CRC, info.file_size)}
+    return ([info for name, info in parent_files.items() if name not in unchanged],
+            [info for name, info in current_files.items() if name not in unchanged])
+
+
+def _extract_zip(zip_file, target_dir, members=None):
+    """
+    Extract members of an open zip file into target_dir.
+    
+    Large archives are spread over EXTRACT_WORKERS threads. ZipFile
+    serializes the reads from the shared file itself, so only the
+    directories have to be created up front to keep the threads from
+    racing on makedirs.
+    
+    Args:
+        zip_file (ZipFile): Archive to extract
+        target_dir (str): Directory to extract into
+        members (list): ZipInfo members to extract, or None for all
+    """
+    if members is None:
+        members = zip_file.infolist()
     
+    files = []
+    paths = []
+    for info in members:
+        # Same path sanitising as ZipFile.extract: no absolute or '..' parts
+        parts = [part for part in info.filename.split('/') if part not in ('', '.', '..')]
+        if not parts:
+            continue
+        if info.is_dir():
+            os.makedirs(os.path.join(target_dir, *parts), exist_ok=True)
+        else:
+            os.makedirs(os.path.join(target_dir, *parts[:-1]), exist_ok=True)
+            files.append(info)
+            paths.append(os.path.join(target_dir, *parts))
+    
+    extract = partial(_extract_zip_member, zip_file, target_dir)
+    if EXTRACT_WORKERS < 2 or sum(info.file_size for info in files) < PARALLEL_EXTRACT_MIN_BYTES:
+        for info, path in zip(files, paths):
+            extract(info, path)
+        return
+    
+    with ThreadPoolExecutor(max_workers=EXTRACT_WORKERS, thread_name_prefix='unzip') as executor:
+        # list() re-raises the first extraction error
+        list(executor.map(extract, files, paths))
+
+
+def _extract_zip_member(zip_file, target_dir, info, path):
+    """
+    Extract one file of an open zip file.
+    
+    Small files go through ZipFile.extract; large ones are copied in
+    EXTRACT_BUFFER_BYTES reads, cutting the read and write calls per file.
+    
+    Args:
+        zip_file (ZipFile): Archive to extract from
+        target_dir (str): Directory the archive is extracted into
+        info (ZipInfo): The member to extract
+        path (str): Sanitised destination of the member under target_dir
+    """
+    if info.file_size <= EXTRACT_BUFFER_BYTES:
+        zip_file.extract(info, target_dir)
+        return
+    with zip_file.open(info) as source, open(path, 'wb') as target:
+        shutil.copyfileobj(source, target, EXTRACT_BUFFER_BYTES)
+
+
+def _unified_diff_path(header):
+    """
+    Path of a file in a unified diff, from the lines before its first hunk.
+    
+    Like the Stash JSON diff, the old path is used unless the file is new.
+    Handles git's a/ and b/ prefixes as well as Bitbucket's src:// and dst://.
+    
+    Args:
+        header (bytes): The file's diff lines up to its first '@@'
+        
+    Returns:
+        str: The file path, or '' if the header has none
+    """
+    paths = {}
+    for line in header.split(b'\n'):
+        if line.startswith((b'--- ', b'+++ ')):
+            path = line[4:].rstrip(b'\t').decode('utf-8', 'replace').strip('"')
+            if '://' in path:
+                path = path.split('://', 1)[1]
+            elif path.startswith(('a/', 'b/')):
+                path = path[2:]
+            paths[line[:3]] = path
+    
+    old_path = paths.get(b'---', '/dev/null')
+    return old_path if old_path != '/dev/null' else paths.get(b'+++', '')
+
+
+@lru_cache(maxsize=None)
+def _local_date(quarter_hour):
+    """
+    Local YYYY-MM-DD date of a quarter hour counted from the Unix epoch.
+    
+    Commits cluster in time (a rebase stamps a whole series within
+    seconds), so most lookups are answered from the cache instead of
+    another fromtimestamp/strftime.
+    """
+    return datetime.fromtimestamp(quarter_hour * QUARTER_HOUR_MS / 1000).strftime('%Y-%m-%d')
+
+
+@lru_cache(maxsize=None)
+def _cloc_path():
+    """Full path of the cloc executable, or None; looked up once per process"""
+    return shutil.which('cloc')
+
+
+@lru_cache(maxsize=None)
+def _cloc_process_args():
+    """
+    cloc arguments that spread its counting over every CPU, if supported.
+    
+    --processes needs a recent cloc with Parallel::ForkManager and does not
+    work on Windows, so it is tried once on an empty directory first.
+    
+    Returns:
+        list: ['--processes=N'], or [] if cloc cannot count in parallel
+    """
+    cpus = os.cpu_count() or 1
+    if os.name == 'nt' or cpus < 2 or _cloc_path() is None:
+        return []
+    option = f'--processes={cpus}'
+    try:
+        with tempfile.TemporaryDirectory() as empty_dir:
+            subprocess.run([_cloc_path(), option, '--quiet', '--json', empty_dir],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True, timeout=60)
+    except (subprocess.SubprocessError, OSError):
+        return []
+    return [option]
+
+
+@lru_cache(maxsize=None)
+def _cloc_extension_args(file_extensions):
+    """
+    cloc arguments restricting the count to the given file extensions.
+    
+    Every commit of an analysis uses the same extensions, so the argument
+    is built once per distinct tuple.
+    
+    Args:
+        file_extensions (tuple): Extensions such as ('.py', '.js'), or () for all
+        
+    Returns:
+        list: ['--include-ext=py,js'], or [] to count every language
+    """
+    if not file_extensions:
+        return []
+    return ['--include-ext=' + ','.join(ext.lstrip('.') for ext in file_extensions)]
+
+
+def _page_older_than(commits, timestamp_ms):
+    """True if every commit on a page was authored and committed before timestamp_ms"""
+    return all(commit.get('authorTimestamp', 0) < timestamp_ms and
+               commit.get('committerTimestamp', 0) < timestamp_ms
+               for commit in commits)
+
+
+def _iso_timestamps_ms(values):
+    """
+    Parse ISO 8601 date strings to Unix epoch milliseconds in one vectorized pass.
+    
+    Strings pandas cannot read are retried one at a time with dateutil;
+    anything still unreadable becomes 0.
+    
+    Args:
+        values (list): Date strings
+        
+    Returns:
+        ndarray: int64 milliseconds, one per value
+    """
+    parsed = pd.to_datetime(pd.Series(values, dtype=object), utc=True, format='ISO8601', errors='coerce')
+    unparsed = np.flatnonzero(parsed.isna().to_numpy())
+    timestamps = parsed.fillna(pd.Timestamp(0, tz='UTC')).dt.as_unit('ms').to_numpy(dtype='int64', copy=True)
+    for i in unparsed:
+        try:
+            timestamps[i] = int(parse(values[i]).timestamp() * 1000)
+        except (ValueError, OverflowError, TypeError):
+            timestamps[i] = 0
+    return timestamps
+
+
+def _has_gui(fig):
+    """True if the figure's canvas belongs to a GUI backend that plt.show() can display"""
+    return fig.canvas.required_interactive_framework is not None
+
+
 def check_cloc_installation():
     """
     Check if cloc is installed on the system.
@@ -1438,8 +2586,17 @@ def main():
                         help='Include merge commits (takes precedence over --ignore-merges)')
     parser.add_argument('--by-user', action='store_true',
                         help='Generate per-user statistics')
-    parser.add_argument('--use-cloc', action='store_true', default=True,
-                        help='Use cloc for calculating lines of code (default: True)')
+    parser.add_argument('--use-cloc', action='store_true',
+                        help='Count lines with cloc on downloaded commit archives instead of '
+                             'the server\'s diff statistics (slower)')
+    parser.add_argument('--no-bulk-stats', action='store_true',
+                        help='Never clone the repository; fetch every commit\'s diff from the API '
+                             f'(by default histories over {BULK_STATS_MIN_COMMITS} commits are read '
+                             'from a cached local clone)')
+    parser.add_argument('--concurrency', type=int, default=5,
+                        help='Number of commits fetched concurrently (default: 5)')
+    parser.add_argument('--rate-limit', type=float,
+                        help='Maximum API requests per second (default: no limit)')
     
     args = parser.parse_args()
     
@@ -1459,7 +2616,7 @@ def main():
         if not has_cloc:
             print("Warning: cloc is not installed. Falling back to traditional diff method.")
     
-    analyzer = BitbucketLOCAnalyzer(base_url=base_url, token=token)
+    analyzer = BitbucketLOCAnalyzer(base_url=base_url, token=token, rate_limit=args.rate_limit)
     
     # Test connection if requested
     if args.test_connection:
@@ -1483,7 +2640,10 @@ def main():
         file_extensions=args.file_extensions,
         ignore_merges=args.ignore_merges,
         include_merges=args.include_merges,
-        by_user=args.by_user
+        by_user=args.by_user,
+        max_workers=args.concurrency,
+        use_cloc=args.use_cloc,
+        bulk_stats=not args.no_bulk_stats
     )
     
     # Handle both standard and user-level analysis results
@@ -1518,7 +2678,7 @@ def main():
             data.to_csv(export_path, index=False)
             print(f"Data exported to {export_path}")
         
-        analyzer.visualize_changes(data, args.workspace, args.repo_slug, args.group_by)
+        analyzer.visualize_changes(data, args.workspace, args.repo_slug, args.group_by, show=False)
         
         # Output user statistics if requested
         if args.by_user and user_df is not None:
@@ -1527,6 +2687,11 @@ def main():
                 analyzer.print_user_statistics(user_df, args.workspace, args.repo_slug)
             else:
                 print("No user statistics data available to display.")
+        
+        # Show every chart at once, after all the statistics are printed;
+        # headless backends have already closed theirs
+        if plt.get_fignums():
+            plt.show()
 
 
 if __name__ == '__main__':
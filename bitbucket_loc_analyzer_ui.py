@@ -17,21 +17,53 @@ import matplotlib
 import time
 import threading
 import queue
+from contextlib import contextmanager
 from functools import lru_cache
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 matplotlib.use('Agg')  # Use non-interactive backend for server environments
+plt.style.use('default')  # Use default style for fastest rendering; set once for every chart
 
 # Global variables for progress tracking and caching
 _analysis_status = {}  # Track analysis progress
 _user_cache = {}
 _cache_lock = threading.Lock()
+# Idle chart figures by (figsize, dpi), reused across requests instead of
+# building a new figure per chart (see _pooled_figure)
+_figure_pool = {}
+_figure_pool_lock = threading.Lock()
+
+@contextmanager
+def _pooled_figure(figsize, dpi=100):
+    """Borrow a blank Agg figure of the given shape, returning it cleared afterwards
+    
+    The figures never go through pyplot, so background analyses can draw
+    charts at the same time without sharing pyplot's current figure.
+    """
+    with _figure_pool_lock:
+        idle = _figure_pool.setdefault((figsize, dpi), queue.SimpleQueue())
+    try:
+        fig = idle.get_nowait()
+    except queue.Empty:
+        fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(fig)
+    try:
+        yield fig
+    finally:
+        fig.clear()
+        # tight_layout moves the subplot margins; start the next chart from the defaults
+        fig.subplots_adjust(**{name: matplotlib.rcParams[f'figure.subplot.{name}']
+                               for name in ('left', 'bottom', 'right', 'top', 'wspace', 'hspace')})
+        idle.put(fig)
 
 def create_simple_chart(data, title, filename, chart_type='bar'):
     """Create simplified, fast-rendering charts optimized for speed"""
-    plt.style.use('default')  # Use default style for fastest rendering
-    
     # Set up figure with minimal DPI for faster rendering
-    fig, ax = plt.subplots(figsize=(10, 5), dpi=75)  # Lower DPI for speed
-    
+    with _pooled_figure((10, 5), dpi=75) as fig:  # Lower DPI for speed
+        _draw_simple_chart(fig, fig.add_subplot(), data, title, filename, chart_type)
+
+def _draw_simple_chart(fig, ax, data, title, filename, chart_type):
+    """Draw one of create_simple_chart's charts on fig and save it to filename"""
     try:
         print(f"Creating {chart_type} chart: {title}")
         print(f"Data type: {type(data)}, Data shape: {data.shape if hasattr(data, 'shape') else 'No shape'}")
@@ -42,7 +74,7 @@ def create_simple_chart(data, title, filename, chart_type='bar'):
             ax.text(0.5, 0.5, 'No data available for chart', 
                     ha='center', va='center', transform=ax.transAxes, fontsize=14)
             ax.set_title(title)
-            plt.savefig(filename, dpi=75, bbox_inches='tight', facecolor='white')
+            fig.savefig(filename, dpi=75, bbox_inches='tight', facecolor='white')
             return
             
         if chart_type == 'time_series':
@@ -58,7 +90,7 @@ def create_simple_chart(data, title, filename, chart_type='bar'):
                     ax.text(0.5, 0.5, 'Invalid data format for time series chart\nMissing additions or deletions columns', 
                             ha='center', va='center', transform=ax.transAxes, fontsize=12)
                     ax.set_title(title)
-                    plt.savefig(filename, dpi=75, bbox_inches='tight', facecolor='white')
+                    fig.savefig(filename, dpi=75, bbox_inches='tight', facecolor='white')
                     return
                 
                 print(f"Creating time series with {len(display_data)} data points")
@@ -105,7 +137,7 @@ def create_simple_chart(data, title, filename, chart_type='bar'):
                     ax.text(0.5, 0.5, 'Invalid data format for user contributions chart\nMissing additions or deletions columns', 
                             ha='center', va='center', transform=ax.transAxes, fontsize=12)
                     ax.set_title(title)
-                    plt.savefig(filename, dpi=75, bbox_inches='tight', facecolor='white')
+                    fig.savefig(filename, dpi=75, bbox_inches='tight', facecolor='white')
                     return
                 
                 print(f"Creating user contributions chart with {len(display_data)} users")
@@ -134,8 +166,8 @@ def create_simple_chart(data, title, filename, chart_type='bar'):
         ax.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
         
         # Tight layout and save with minimal settings
-        plt.tight_layout()
-        plt.savefig(filename, dpi=75, bbox_inches='tight', facecolor='white', 
+        fig.tight_layout()
+        fig.savefig(filename, dpi=75, bbox_inches='tight', facecolor='white', 
                    format='png')
         print(f"Chart saved successfully: {filename}")
         
@@ -149,10 +181,7 @@ def create_simple_chart(data, title, filename, chart_type='bar'):
         ax.text(0.5, 0.5, f'Chart generation failed:\n{str(e)}', 
                 ha='center', va='center', transform=ax.transAxes, fontsize=12)
         ax.set_title(title)
-        plt.savefig(filename, dpi=75, bbox_inches='tight', facecolor='white')
-        
-    finally:
-        plt.close(fig)  # Always close to free memory
+        fig.savefig(filename, dpi=75, bbox_inches='tight', facecolor='white')
     
 def update_analysis_status(analysis_id, status, progress=0):
     """Update analysis status for progress tracking"""
@@ -627,7 +656,6 @@ def demo():
     }
     
     # Generate combined chart with our sample data
-    plt.figure(figsize=(14, 10))  # Larger figure for better readability
     df = pd.DataFrame([
         {
             'name': stats['name'],
@@ -643,12 +671,30 @@ def demo():
     # Sort by total activity (additions + deletions) to get most active contributors
     df = df.sort_values('total_changes', ascending=False).head(10)
     
+    with _pooled_figure((14, 10)) as fig:  # Larger figure for better readability
+        _draw_combined_chart(fig, fig.add_subplot(), df, workspace, repo_slug, combined_chart_file)
+    
+    # Render template with our demo data
+    return render_template('results.html',
+                          workspace=workspace,
+                          repo_slug=repo_slug,
+                          start_date=start_date,
+                          end_date=end_date,
+                          chart_file='sample_loc_changes.png',
+                          user_chart_file='sample_loc_changes.png',
+                          user_stats_file='sample_loc_data.csv',
+                          daily_stats_file='sample_loc_data.csv',
+                          combined_chart_file=os.path.basename(combined_chart_file),
+                          user_data=df.to_dict('records'))
+
+def _draw_combined_chart(fig, ax, df, workspace, repo_slug, combined_chart_file):
+    """Draw the demo's combined contributor chart of df on fig and save it"""
     # The y-position for each author
     y_pos = range(len(df['name']))
     
     # Create horizontal bar chart with more space between bars
-    bars_add = plt.barh(y_pos, df['additions'], color='green', alpha=0.7, label='Additions', height=0.4)
-    bars_del = plt.barh(y_pos, -df['deletions'], color='red', alpha=0.7, label='Deletions', height=0.4)
+    bars_add = ax.barh(y_pos, df['additions'], color='green', alpha=0.7, label='Additions', height=0.4)
+    bars_del = ax.barh(y_pos, -df['deletions'], color='red', alpha=0.7, label='Deletions', height=0.4)
     
     # Calculate maximum values for axis scaling and text positioning
     max_add = df['additions'].max() 
@@ -658,7 +704,7 @@ def demo():
     # Add PR and direct commit counts
     for i, (_, row) in enumerate(df.iterrows()):
         # Position text on the right side of additions bar with proper offset
-        plt.text(
+        ax.text(
             max_add + (max_val * 0.05),
             i,
             f"PRs: {row['pr_count']}, Direct: {row['direct_commits']}",
@@ -669,33 +715,34 @@ def demo():
         
     # Set author names as y-tick labels with shorter names if needed
     short_names = [name[:25] + '...' if len(name) > 25 else name for name in df['name']]
-    plt.yticks(y_pos, short_names)
+    ax.set_yticks(y_pos)
+    ax.set_yticklabels(short_names)
     
-    plt.title(f'Combined Contributor Analysis - {workspace}/{repo_slug}')
-    plt.xlabel('Lines of Code')
-    plt.ylabel('Contributors')
-    plt.legend(loc='lower right')
-    plt.grid(True, linestyle='--', alpha=0.7)
-    plt.axvline(x=0, color='black', linewidth=0.5)
+    ax.set_title(f'Combined Contributor Analysis - {workspace}/{repo_slug}')
+    ax.set_xlabel('Lines of Code')
+    ax.set_ylabel('Contributors')
+    ax.legend(loc='lower right')
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.axvline(x=0, color='black', linewidth=0.5)
     
     # Set x-axis limits to make sure there's enough space for labels
-    plt.xlim(-max_del * 1.2, max_add * 1.4)  # Asymmetric to allow space for PR/commit counts
+    ax.set_xlim(-max_del * 1.2, max_add * 1.4)  # Asymmetric to allow space for PR/commit counts
     
     # Add numbers on the bars for clarity
     for i, v in enumerate(df['additions']):
         if v > 0 and v > max_add * 0.05:  # Only add text if bar is large enough
-            plt.text(v/2, i, f"{v:,}", 
+            ax.text(v/2, i, f"{v:,}", 
                     color='white', fontweight='bold', va='center', ha='center')
     
     for i, v in enumerate(df['deletions']):
         if v > 0 and v > max_del * 0.05:  # Only add text if bar is large enough
-            plt.text(-v/2, i, f"{v:,}", 
+            ax.text(-v/2, i, f"{v:,}", 
                     color='white', fontweight='bold', va='center', ha='center')
     
     # Add total changes as text for each contributor
     for i, row in enumerate(df.itertuples()):
-        plt.text(
-            plt.xlim()[1] * 0.92, 
+        ax.text(
+            ax.get_xlim()[1] * 0.92, 
             i,
             f"Total: {row.total_changes:,}",
             va='center',
@@ -705,22 +752,10 @@ def demo():
             fontweight='bold'
         )
     
-    plt.tight_layout()
-    plt.savefig(combined_chart_file, dpi=300)
-    plt.close()
-    
-    # Render template with our demo data
-    return render_template('results.html',
-                          workspace=workspace,
-                          repo_slug=repo_slug,
-                          start_date=start_date,
-                          end_date=end_date,
-                          chart_file='sample_loc_changes.png',
-                          user_chart_file='sample_loc_changes.png',
-                          user_stats_file='sample_loc_data.csv',
-                          daily_stats_file='sample_loc_data.csv',
-                          combined_chart_file=os.path.basename(combined_chart_file),
-                          user_data=df.to_dict('records'))
+    fig.tight_layout()
+    # Screen resolution is all the browser shows; the figure is already laid
+    # out at its final size, and fast zlib settings suit a per-request PNG
+    fig.savefig(combined_chart_file, dpi=100, bbox_inches=None, pil_kwargs={'compress_level': 1})
 
 def analyze_multiple_repositories(analyzer, workspace, repo_slugs, start_date, end_date, group_by, focus_user=None):
     """Analyze multiple repositories and combine the results with strict user filtering.
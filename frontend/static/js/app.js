@@ -504,6 +504,13 @@ class BitbucketAnalyzerApp {
      */
     cancelAnalysis() {
         this.stopProgressTracking();
+
+        // Ask the backend to stop the job so it releases its worker threads
+        if (this.currentJobId) {
+            fetch(`${this.apiBaseUrl}/jobs/${this.currentJobId}/cancel`, { method: 'POST' })
+                .catch(error => console.error('Error cancelling job:', error));
+        }
+
         this.currentJobId = null;
         this.hideProgressSection();
         this.showError('Analysis cancelled by user');
@@ -726,7 +733,7 @@ class BitbucketAnalyzerApp {
             const ext = file.split('.').pop().toLowerCase();
             if (['png', 'jpg', 'jpeg', 'svg'].includes(ext)) {
                 groups['Charts'].push(file);
-            } else if (['csv', 'json', 'xlsx'].includes(ext)) {
+            } else if (['csv', 'parquet', 'json', 'xlsx'].includes(ext)) {
                 groups['Data Files'].push(file);
             } else if (['md', 'txt', 'html', 'pdf'].includes(ext)) {
                 groups['Reports'].push(file);
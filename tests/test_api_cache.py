@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-disk API response cache
+
+Uses a fake HTTP session instead of talking to Bitbucket.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import bitbucket_loc_analyzer
+from bitbucket_loc_analyzer import APICache, BitbucketLOCAnalyzer, CommitStatsCache
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.text = content.decode()
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+
+def test_expired_entry_revalidated_with_etag(tmp_path):
+    """An expired response is reused when the server answers 304"""
+    analyzer = BitbucketLOCAnalyzer(base_url='https://stash.example.com', token='token')
+    analyzer.stats_cache = CommitStatsCache(str(tmp_path / 'stats'))
+    analyzer.cache = APICache(str(tmp_path), expiry_seconds=0)
+    sent_headers = []
+
+    def fake_get(url, params=None, headers=None, **kwargs):
+        sent_headers.append(headers)
+        if headers.get('If-None-Match') == '"v1"':
+            return FakeResponse(304)
+        return FakeResponse(200, b'{"values": [1]}', {'Content-Type': 'application/json', 'ETag': '"v1"'})
+
+    analyzer.session.get = fake_get
+
+    assert analyzer._make_request('https://stash.example.com/commits', {'limit': 1}) == {'values': [1]}
+    assert analyzer._make_request('https://stash.example.com/commits', {'limit': 1}) == {'values': [1]}
+    assert sent_headers == [{}, {'If-None-Match': '"v1"'}]
+
+
+def test_commit_info_memo_scoped_per_analysis(tmp_path):
+    """Commit details are fetched once per analysis, and the memo ends with it"""
+    analyzer = BitbucketLOCAnalyzer(base_url='https://stash.example.com', token='token')
+    analyzer.stats_cache = CommitStatsCache(str(tmp_path / 'stats'))
+    requested = []
+
+    def fake_request(url, params=None):
+        requested.append(url)
+        return {'id': url[-1], 'parents': [{'id': 'p'}]}
+
+    analyzer._make_request = fake_request
+
+    @bitbucket_loc_analyzer._scoped_commit_info_memo
+    def analysis():
+        for commit_hash in ('a', 'b', 'a'):
+            analyzer._get_commit_info('PROJ', 'repo', commit_hash)
+
+    analysis()
+    analysis()
+    assert len(requested) == 4
+    assert bitbucket_loc_analyzer._commit_info_memo.get() is None
+
+
+def test_lru_memo_is_bounded():
+    memo = bitbucket_loc_analyzer._LRUMemo(2)
+    memo.set('a', 1)
+    memo.set('b', 2)
+    memo.get('a')
+    memo.set('c', 3)
+
+    assert (memo.get('a'), memo.get('b'), memo.get('c')) == (1, None, 3)
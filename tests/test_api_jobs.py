@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Tests for the background job handling in the Flask API backend
+
+Jobs run through the real MultiRepoAnalyzer; only the Bitbucket API
+requests are stubbed, so no server is needed.
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend', 'api'))
+
+import app as api
+import bitbucket_loc_analyzer
+import multi_repo_analyzer
+from bitbucket_loc_analyzer import BitbucketLOCAnalyzer
+
+
+def make_job(repo_slugs, **extra_config):
+    return api.AnalysisJob('test-job', {
+        'token': 'token',
+        'base_url': 'https://api.bitbucket.org',
+        'workspace': 'PROJ',
+        'repo_slugs': repo_slugs,
+        'start_date': '2025-06-20',
+        'end_date': '2025-06-26',
+        **extra_config
+    })
+
+
+CLOUD_COMMITS = [
+    {'hash': 'c3', 'date': '2025-06-24T10:00:00+00:00', 'parents': [{'hash': 'c2'}],
+     'author': {'raw': 'Bob <bob@example.com>', 'user': {'display_name': 'Bob'}}},
+    {'hash': 'c2', 'date': '2025-06-23T10:00:00+00:00', 'parents': [{'hash': 'c1'}],
+     'author': {'raw': 'Alice <alice@example.com>', 'user': {'display_name': 'Alice'}}},
+    {'hash': 'c1', 'date': '2025-06-23T09:00:00+00:00', 'parents': [],
+     'author': {'raw': 'Alice <alice@example.com>', 'user': {'display_name': 'Alice'}}}
+]
+
+CLOUD_DIFFSTATS = {
+    'c1': [{'new': {'path': 'app.py'}, 'lines_added': 10, 'lines_removed': 0}],
+    'c2': [{'new': {'path': 'app.py'}, 'lines_added': 4, 'lines_removed': 2}],
+    'c3': [{'new': {'path': 'README.md'}, 'lines_added': 1, 'lines_removed': 1}]
+}
+
+
+def fake_cloud_api(self, url, params=None):
+    """Answer the Bitbucket Cloud requests an analysis makes
+
+    'broken-repo' fails and 'empty-repo' has no commits in the range.
+    """
+    if '/broken-repo/' in url:
+        raise RuntimeError("boom")
+    if url.endswith('/commits'):
+        if '/empty-repo/' in url:
+            return {'values': []}
+        return {'values': [dict(commit) for commit in CLOUD_COMMITS]}
+    commit_hash = url.rsplit('/', 1)[-1]
+    return {'values': CLOUD_DIFFSTATS[commit_hash]}
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    """Send job output and the analyzer's caches to tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(bitbucket_loc_analyzer, 'STATS_CACHE_DIR', str(tmp_path / 'stats'))
+    output_dir = tmp_path / 'output'
+    output_dir.mkdir()
+    monkeypatch.setattr(api, 'OUTPUT_DIR', str(output_dir))
+    return output_dir
+
+
+def record_statuses(job, monkeypatch):
+    statuses = []
+    update_status = job.update_status
+    monkeypatch.setattr(job, 'update_status',
+                        lambda status, *args: (statuses.append(status), update_status(status, *args)))
+    return statuses
+
+
+def test_run_analysis_job_with_real_analyzer(output_dir, monkeypatch):
+    """A job runs end to end through MultiRepoAnalyzer with only the API stubbed"""
+    monkeypatch.setattr(BitbucketLOCAnalyzer, '_make_request', fake_cloud_api)
+
+    job = make_job('repo-a')
+    statuses = record_statuses(job, monkeypatch)
+    api.run_analysis_job(job)
+
+    assert job.status == 'completed', job.error
+    assert statuses[-2:] == ['finalizing', 'completed']
+    assert job.results['repo_results'] == {
+        'repo-a': {
+            'display_name': 'Repo A',
+            'total_commits': 3,
+            'total_contributors': 2,
+            'total_additions': 15,
+            'total_deletions': 3
+        }
+    }
+    assert 'repo-a_daily_data.csv' in job.generated_files
+
+    with api.job_lock:
+        api.analysis_jobs[job.job_id] = job
+    data = api.app.test_client().get(f'/api/jobs/{job.job_id}/results').get_json()
+    assert data['results']['repo_results']['repo-a']['total_additions'] == 15
+
+
+def test_run_analysis_job_parallel(output_dir, monkeypatch):
+    """Failed and empty repositories are skipped and results keep input order"""
+    monkeypatch.setattr(BitbucketLOCAnalyzer, '_make_request', fake_cloud_api)
+
+    job = make_job('repo-a, broken-repo, empty-repo, repo-b, repo-c')
+    api.run_analysis_job(job)
+
+    assert job.status == 'completed', job.error
+    assert job.progress == 100
+    assert list(job.results['repo_results']) == ['repo-a', 'repo-b', 'repo-c']
+    for slug in ('repo-a', 'repo-b', 'repo-c'):
+        assert f'{slug}_daily_data.csv' in job.generated_files
+    assert 'combined_multi_repo_dashboard.png' in job.generated_files
+    assert 'analysis_report.md' in job.generated_files
+
+
+def test_job_status_etag():
+    """Status polling returns 304 until the job changes"""
+    job = make_job('repo-a')
+    with api.job_lock:
+        api.analysis_jobs[job.job_id] = job
+
+    client = api.app.test_client()
+    first = client.get(f'/api/jobs/{job.job_id}/status')
+    etag = first.headers['ETag']
+    assert first.status_code == 200
+
+    cached = client.get(f'/api/jobs/{job.job_id}/status', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.headers['ETag'] == etag
+
+    job.update_status("analyzing", 50, "Halfway there")
+    changed = client.get(f'/api/jobs/{job.job_id}/status', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.get_json()['progress'] == 50
+
+
+def test_job_status_serializes_datetimes():
+    """Job timestamps are returned as ISO 8601 strings"""
+    job = make_job('repo-a')
+    with api.job_lock:
+        api.analysis_jobs[job.job_id] = job
+
+    data = api.app.test_client().get(f'/api/jobs/{job.job_id}/status').get_json()
+    assert data['start_time'] == job.start_time.isoformat()
+    assert data['end_time'] is None
+
+
+def test_file_download_missing_and_existing(tmp_path, monkeypatch):
+    """Missing files return 404 and existing files are served"""
+    output_dir = os.path.realpath(tmp_path)
+    monkeypatch.setattr(api, 'OUTPUT_DIR', output_dir)
+    with open(os.path.join(output_dir, 'report.md'), 'w') as f:
+        f.write('# Report\n')
+
+    client = api.app.test_client()
+    assert client.get('/api/files/missing.md').status_code == 404
+    assert client.get('/api/files/missing.md/view').status_code == 404
+
+    response = client.get('/api/files/report.md/view')
+    assert response.status_code == 200
+    assert response.data == b'# Report\n'
+    response.close()
+
+
+def hung_api(release):
+    """A Bitbucket API whose requests hang until release is set"""
+    def make_request(self, url, params=None):
+        release.wait(5)
+        return None
+    return make_request
+
+
+def run_job_in_thread(job):
+    thread = threading.Thread(target=api.run_analysis_job, args=(job,))
+    thread.start()
+    return thread
+
+
+def test_cancel_running_job(output_dir, monkeypatch):
+    """Cancelling a job frees the job thread even while a fetch is hung"""
+    release = threading.Event()
+    monkeypatch.setattr(BitbucketLOCAnalyzer, '_make_request', hung_api(release))
+    monkeypatch.setattr(multi_repo_analyzer, 'STOP_POLL_INTERVAL_S', 0.05)
+
+    job = make_job('repo-a')
+    with api.job_lock:
+        api.analysis_jobs[job.job_id] = job
+    thread = run_job_in_thread(job)
+
+    client = api.app.test_client()
+    assert client.post(f'/api/jobs/{job.job_id}/cancel').status_code == 202
+    thread.join(2)
+    release.set()
+
+    assert not thread.is_alive()
+    assert job.status == 'cancelled'
+    assert not (output_dir / 'analysis_report.md').exists()
+    assert client.post(f'/api/jobs/{job.job_id}/cancel').status_code == 400
+
+
+def test_job_deadline(output_dir, monkeypatch):
+    """Jobs past their deadline are marked failed with a timeout error"""
+    release = threading.Event()
+    monkeypatch.setattr(BitbucketLOCAnalyzer, '_make_request', hung_api(release))
+    monkeypatch.setattr(multi_repo_analyzer, 'STOP_POLL_INTERVAL_S', 0.05)
+
+    job = make_job('repo-a', timeout_s=0.1)
+    thread = run_job_in_thread(job)
+    thread.join(2)
+    release.set()
+
+    assert not thread.is_alive()
+    assert job.status == 'failed'
+    assert job.error == 'Analysis failed: timeout'
+    assert not (output_dir / 'analysis_report.md').exists()
+
+
+def test_start_analysis_validates_timeout(monkeypatch):
+    """Non-numeric, non-finite or non-positive timeouts are rejected with 400"""
+    started = []
+    monkeypatch.setattr(api, 'run_analysis_job', started.append)
+    client = api.app.test_client()
+    payload = dict(make_job('repo-a').config)
+
+    for timeout_s in ('soon', None, True, -5, 0, 'nan', 'inf'):
+        response = client.post('/api/analyze', json={**payload, 'timeout_s': timeout_s})
+        assert response.status_code == 400, timeout_s
+        assert 'timeout_s' in response.get_json()['error']
+    assert started == []
+
+    response = client.post('/api/analyze', json={**payload, 'timeout_s': '90'})
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+    with api.job_lock:
+        job = api.analysis_jobs.pop(job_id)
+    assert job.config['timeout_s'] == 90.0
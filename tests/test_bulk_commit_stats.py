@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for reading commit statistics from a local clone
+
+Builds a throwaway git repository instead of talking to Bitbucket.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bitbucket_loc_analyzer import BitbucketLOCAnalyzer, CommitStatsCache
+
+pytestmark = pytest.mark.skipif(not shutil.which('git'), reason="git is not installed")
+
+
+def git(repo, *args):
+    return subprocess.run(['git', '-C', str(repo), *args], check=True,
+                          stdout=subprocess.PIPE, text=True).stdout
+
+
+def make_repo(path):
+    """Three commits: add files, rename with an edit, then a merge"""
+    git(path, 'init', '-q', '-b', 'main')
+    git(path, 'config', 'user.email', 'dev@example.com')
+    git(path, 'config', 'user.name', 'Dev')
+    (path / 'app.py').write_text("a\nb\n")
+    (path / 'logo.png').write_bytes(b'\x89PNG\x00\x01')
+    (path / 'notes.md').write_text("x\n")
+    git(path, 'add', '.')
+    git(path, 'commit', '-qm', 'initial')
+    git(path, 'mv', 'app.py', 'main.py')
+    (path / 'main.py').write_text("a\nb\nc\n")
+    git(path, 'commit', '-qam', 'rename')
+    git(path, 'checkout', '-qb', 'feature')
+    (path / 'feature.py').write_text("f\n")
+    git(path, 'add', '.')
+    git(path, 'commit', '-qm', 'feature')
+    git(path, 'checkout', '-q', 'main')
+    git(path, 'merge', '-q', '--no-ff', '--no-edit', 'feature')
+    return git(path, 'log', '--format=%H').split()
+
+
+@pytest.fixture
+def analyzer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    analyzer = BitbucketLOCAnalyzer(base_url='https://stash.example.com', token='token')
+    analyzer.stats_cache = CommitStatsCache(str(tmp_path / 'stats'))
+    origin = tmp_path / 'origin'
+    origin.mkdir()
+    analyzer.hashes = make_repo(origin)
+    monkeypatch.setattr(analyzer, '_clone_url', lambda workspace, repo_slug: str(origin))
+    return analyzer
+
+
+def test_bulk_commit_stats_matches_diff_rules(analyzer):
+    """Merges count as zero and skipped files are ignored"""
+    merge, feature, rename, initial = analyzer.hashes
+    missing = 'f' * 40
+
+    stats = analyzer.bulk_commit_stats('PROJ', 'repo', analyzer.hashes + [missing])
+
+    assert stats[merge] == {'additions': 0, 'deletions': 0}
+    assert stats[feature] == {'additions': 1, 'deletions': 0}
+    assert stats[rename] == {'additions': 1, 'deletions': 0}
+    # logo.png is skipped, app.py and notes.md count
+    assert stats[initial] == {'additions': 3, 'deletions': 0}
+    assert missing not in stats
+
+
+def test_bulk_commit_stats_file_extensions(analyzer):
+    """Renamed files are matched on their old path"""
+    merge, feature, rename, initial = analyzer.hashes
+
+    stats = analyzer.bulk_commit_stats('PROJ', 'repo', analyzer.hashes, ['.md'])
+
+    assert stats[initial] == {'additions': 1, 'deletions': 0}
+    assert stats[rename] == {'additions': 0, 'deletions': 0}
+
+
+def test_bulk_commit_stats_cached_across_runs(analyzer, monkeypatch):
+    """A second run answers from the stats cache without touching git"""
+    first = analyzer.bulk_commit_stats('PROJ', 'repo', analyzer.hashes)
+    monkeypatch.setattr(analyzer, '_ensure_local_clone', lambda *args: pytest.fail("cloned again"))
+
+    assert analyzer.bulk_commit_stats('PROJ', 'repo', analyzer.hashes) == first
+
+
+def test_local_clone_persists_across_analyzers(analyzer, tmp_path, monkeypatch):
+    """Later analyzers fetch into the clone under the stats cache instead of cloning again"""
+    analyzer.bulk_commit_stats('PROJ', 'repo', analyzer.hashes)
+    clone_dir = analyzer._local_clone_dir('PROJ', 'repo')
+    assert clone_dir.startswith(str(tmp_path / 'stats'))
+    assert os.path.isdir(clone_dir)
+
+    origin = tmp_path / 'origin'
+    (origin / 'later.py').write_text("l\n")
+    git(origin, 'add', '.')
+    git(origin, 'commit', '-qm', 'later')
+    later = git(origin, 'rev-parse', 'HEAD').strip()
+
+    second = BitbucketLOCAnalyzer(base_url='https://stash.example.com', token='token')
+    second.stats_cache = CommitStatsCache(str(tmp_path / 'stats'))
+    monkeypatch.setattr(second, '_clone_url', lambda workspace, repo_slug: str(origin))
+    commands = []
+    run_git = second._git
+    monkeypatch.setattr(second, '_git', lambda *args, **kwargs: commands.append(args[2]) or run_git(*args, **kwargs))
+
+    stats = second.bulk_commit_stats('PROJ', 'repo', [later])
+
+    assert stats == {later: {'additions': 1, 'deletions': 0}}
+    assert commands == ['fetch', 'log']
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for commit listing and date filtering
+
+Serves canned API pages instead of talking to Bitbucket.
+"""
+
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bitbucket_loc_analyzer import BitbucketLOCAnalyzer, CommitStatsCache
+
+DAY_MS = 86400000
+JULY_1_MS = int(datetime(2025, 7, 1, 12).timestamp() * 1000)
+
+
+def test_stash_stops_paging_before_start_date(tmp_path):
+    """Pages older than the start date are not fetched"""
+    analyzer = BitbucketLOCAnalyzer(base_url='https://stash.example.com', token='token')
+    analyzer.stats_cache = CommitStatsCache(str(tmp_path / 'stats'))
+    total = 5000
+    requested = []
+
+    def fake_request(url, params=None):
+        start, limit = params['start'], params['limit']
+        requested.append(start)
+        # One commit every 2.4 hours, newest first
+        values = [{'id': str(i), 'authorTimestamp': JULY_1_MS - i * DAY_MS // 10}
+                  for i in range(start, min(start + limit, total))]
+        response = {'values': values, 'isLastPage': start + limit >= total}
+        if not response['isLastPage']:
+            response['nextPageStart'] = start + limit
+        return response
+
+    analyzer._make_request = fake_request
+    commits = analyzer.get_commits('PROJ', 'repo', '2025-06-01', '2025-07-01')
+
+    assert [int(commit['id']) for commit in commits] == list(range(len(commits)))
+    assert len(commits) == 306
+    assert len(requested) < total // 100
+
+
+def test_cloud_follows_next_and_filters_by_date(tmp_path):
+    """Cloud pages are followed through 'next' and filtered on the parsed dates"""
+    analyzer = BitbucketLOCAnalyzer(token='token')
+    analyzer.stats_cache = CommitStatsCache(str(tmp_path / 'stats'))
+    pages = {
+        'next-page': {'values': [{'hash': 'c', 'date': '2025-05-01T12:00:00+00:00'}]},
+        None: {'values': [{'hash': 'a', 'date': '2025-06-20T12:00:00+00:00'},
+                          {'hash': 'b', 'date': '2025-06-10T12:00:00+00:00'}],
+               'next': 'next-page'},
+    }
+    analyzer._make_request = lambda url, params=None: pages.get(url, pages[None])
+
+    commits = analyzer.get_commits('team', 'repo', '2025-06-01', '2025-06-30')
+
+    assert [commit['hash'] for commit in commits] == ['a', 'b']
+    assert [analyzer._commit_fields(commit)[1] for commit in commits] == ['2025-06-20', '2025-06-10']
+
+
+def test_cloud_commit_date_same_with_and_without_parsed_timestamps(tmp_path):
+    """Commits are bucketed by local date whether or not get_commits parsed them"""
+    analyzer = BitbucketLOCAnalyzer(token='token')
+    analyzer.stats_cache = CommitStatsCache(str(tmp_path / 'stats'))
+    commits = [{'hash': 'a', 'date': '2025-06-20T23:30:00-05:00'},
+               {'hash': 'b', 'date': '2025-06-20T00:30:00+09:00', 'committer_date': '2025-06-21T01:00:00+14:00'}]
+    parsed = [dict(commit) for commit in commits]
+    analyzer._add_cloud_timestamps(parsed)
+
+    expected = [datetime.fromtimestamp(commit['committerTimestamp'] / 1000).strftime('%Y-%m-%d') for commit in parsed]
+    assert [analyzer._commit_fields(commit)[1] for commit in commits] == expected
+    assert [analyzer._commit_fields(commit)[1] for commit in parsed] == expected
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for measuring commits with cloc
+
+Uses a fake HTTP session and cloc run instead of talking to Bitbucket.
+"""
+
+import io
+import os
+import sys
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import bitbucket_loc_analyzer
+from bitbucket_loc_analyzer import BitbucketLOCAnalyzer
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b''):
+        self.status_code = status_code
+        self.content = content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        return [self.content]
+
+
+def test_only_changed_files_are_downloaded(monkeypatch, tmp_path):
+    """Small commits fetch their changed files instead of full archives"""
+    monkeypatch.setattr(bitbucket_loc_analyzer, '_cloc_path', lambda: 'cloc')
+    analyzer = BitbucketLOCAnalyzer(base_url='https://stash.example.com', token='token')
+    analyzer.stats_cache = bitbucket_loc_analyzer.CommitStatsCache(str(tmp_path / 'stats'))
+    changes = {'values': [{'path': {'toString': 'src/app.py'}},
+                          {'path': {'toString': 'src/new.py'}},
+                          {'path': {'toString': 'logo.png'}}],
+               'isLastPage': True}
+    analyzer._make_request = lambda url, params=None: changes if url.endswith('/changes') else None
+    files = {('src/app.py', 'p'): b'a\n', ('src/app.py', 'c'): b'a\nb\n', ('src/new.py', 'c'): b'n\n'}
+    requested = []
+
+    def fake_get(url, **kwargs):
+        requested.append(url)
+        path, commit_hash = url.split('/raw/')[1].split('?at=')
+        content = files.get((path, commit_hash))
+        return FakeResponse(404) if content is None else FakeResponse(200, content)
+
+    monkeypatch.setattr(analyzer.session, 'get', fake_get)
+
+    def fake_cloc(parent_dir, current_dir, file_extensions=None):
+        tree = lambda root: {os.path.relpath(os.path.join(d, f), root): open(os.path.join(d, f), 'rb').read()
+                             for d, _, names in os.walk(root) for f in names}
+        assert tree(parent_dir) == {'src/app.py': b'a\n'}
+        assert tree(current_dir) == {'src/app.py': b'a\nb\n', 'src/new.py': b'n\n'}
+        return {'additions': 2, 'deletions': 0}
+
+    monkeypatch.setattr(analyzer, '_run_cloc_comparison', fake_cloc)
+
+    stats = analyzer.get_loc_changes_with_cloc('PROJ', 'repo', 'c', ['.py'], {'id': 'c', 'parents': [{'id': 'p'}]})
+
+    assert stats == {'additions': 2, 'deletions': 0}
+    assert len(requested) == 4
+    assert not any('archive' in url for url in requested)
+
+
+def test_large_commits_extract_only_differing_archive_members(monkeypatch, tmp_path):
+    """Without a change list, files identical in both archives are not extracted"""
+    monkeypatch.setattr(bitbucket_loc_analyzer, '_cloc_path', lambda: 'cloc')
+    analyzer = BitbucketLOCAnalyzer(base_url='https://stash.example.com', token='token')
+    analyzer.stats_cache = bitbucket_loc_analyzer.CommitStatsCache(str(tmp_path / 'stats'))
+    analyzer._make_request = lambda url, params=None: None
+    archives = {}
+    for commit_hash, files in {'p': {'same.py': b's\n', 'app.py': b'a\n', 'gone.py': b'g\n'},
+                               'c': {'same.py': b's\n', 'app.py': b'a\nb\n', 'new.py': b'n\n'}}.items():
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            for name, content in files.items():
+                archive.writestr(name, content)
+        archives[commit_hash] = buffer.getvalue()
+    monkeypatch.setattr(analyzer.session, 'get',
+                        lambda url, **kwargs: FakeResponse(200, archives[url.split('?at=')[1]]))
+
+    def fake_cloc(parent_dir, current_dir, file_extensions=None):
+        assert sorted(os.listdir(parent_dir)) == ['app.py', 'gone.py']
+        assert sorted(os.listdir(current_dir)) == ['app.py', 'new.py']
+        return {'additions': 2, 'deletions': 1}
+
+    monkeypatch.setattr(analyzer, '_run_cloc_comparison', fake_cloc)
+
+    stats = analyzer.get_loc_changes_with_cloc('PROJ', 'repo', 'c', None, {'id': 'c', 'parents': [{'id': 'p'}]})
+
+    assert stats == {'additions': 2, 'deletions': 1}
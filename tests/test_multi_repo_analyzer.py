@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for the multi-repository report and data files
+
+Uses a rendering-only analyzer, so no Bitbucket server is needed.
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend', 'core'))
+
+import multi_repo_analyzer
+from multi_repo_analyzer import MultiRepoAnalyzer
+
+
+def test_write_table_csv_matches_pandas(tmp_path):
+    """Data CSVs are byte-for-byte what DataFrame.to_csv writes"""
+    renderer = MultiRepoAnalyzer.renderer(str(tmp_path), 'PROJ')
+    df = pd.DataFrame({
+        'date': pd.to_datetime(['2024-12-01', '2024-12-02']),
+        'name': ['Doe, Jane', 'plain'],
+        'additions': [10, 0],
+        'ratio': [0.5, 1.25],
+    })
+
+    renderer._write_table(df, str(tmp_path / 'table.csv'))
+    df.to_csv(tmp_path / 'expected.csv', index=False)
+
+    assert (tmp_path / 'table.csv').read_bytes() == (tmp_path / 'expected.csv').read_bytes()
+    assert (tmp_path / 'table.csv').read_text().splitlines()[1] == '2024-12-01,"Doe, Jane",10,0.5'
+
+
+def test_report_lists_the_data_files_written(tmp_path):
+    """The report names exactly the CSV (and Parquet) files _write_table produced"""
+    renderer = MultiRepoAnalyzer.renderer(str(tmp_path), 'PROJ')
+    renderer._write_table(pd.DataFrame({'additions': [1]}), str(tmp_path / 'repo_daily_data.csv'))
+
+    listed = renderer._data_file_names('repo_daily_data').replace('`', '').split(', ')
+
+    assert sorted(listed) == sorted(os.listdir(tmp_path))
+
+
+def report_results(total_additions=1200):
+    meta = {'start_date': '2025-06-01', 'end_date': '2025-06-30', 'group_by': 'day',
+            'total_additions': total_additions, 'total_deletions': 200, 'total_commits': 3,
+            'total_contributors': 2}
+    return {'repo': {'display_name': 'Repo', 'analysis_meta': meta, 'daily_data': pd.DataFrame()}}
+
+
+def cache_entries(output_dir):
+    return sorted(os.listdir(output_dir / multi_repo_analyzer.REPORT_CACHE_DIR))
+
+
+def test_report_body_cached_by_content_and_version(tmp_path, monkeypatch):
+    """Re-runs reuse the cached body until the results or the template version change"""
+    renderer = MultiRepoAnalyzer.renderer(str(tmp_path), 'PROJ')
+    renderer._generate_analysis_report(report_results())
+    report = (tmp_path / 'analysis_report.md').read_text(encoding='utf-8')
+    assert "- Net Changes: 1,000 lines\n" in report
+    assert len(cache_entries(tmp_path)) == 1
+
+    rendered = []
+    render = renderer._render_report_body
+    monkeypatch.setattr(renderer, '_render_report_body', lambda results: rendered.append(1) or render(results))
+
+    renderer._generate_analysis_report(report_results())
+    assert rendered == []
+    assert (tmp_path / 'analysis_report.md').read_text(encoding='utf-8').split('---')[1:] == report.split('---')[1:]
+
+    renderer._generate_analysis_report(report_results(total_additions=1300))
+    monkeypatch.setattr(multi_repo_analyzer, 'REPORT_CACHE_VERSION', multi_repo_analyzer.REPORT_CACHE_VERSION + 1)
+    renderer._generate_analysis_report(report_results())
+    assert rendered == [1, 1]
+    assert len(cache_entries(tmp_path)) == 3
+
+
+def test_report_cache_pruned_and_written_atomically(tmp_path, monkeypatch):
+    """Only the newest entries are kept and no temporary files are left behind"""
+    monkeypatch.setattr(multi_repo_analyzer, 'REPORT_CACHE_MAX_ENTRIES', 2)
+    renderer = MultiRepoAnalyzer.renderer(str(tmp_path), 'PROJ')
+    for total_additions in (1000, 2000, 3000):
+        renderer._generate_analysis_report(report_results(total_additions))
+
+    entries = cache_entries(tmp_path)
+    assert len(entries) == 2
+    assert not any(name.endswith('.tmp') for name in entries)
+
+    # A read counts as a use, so the entry just read survives the next prune
+    renderer._generate_analysis_report(report_results(2000))
+    renderer._generate_analysis_report(report_results(4000))
+    rendered = []
+    monkeypatch.setattr(renderer, '_render_report_body', lambda results: rendered.append(1) or '')
+    renderer._generate_analysis_report(report_results(2000))
+    renderer._generate_analysis_report(report_results(3000))
+    assert rendered == [1]
+
+
+def daily_frame(commits=None):
+    """Ten days of changes, with a commits column when counts are given"""
+    dates = pd.date_range('2025-06-02', periods=10)
+    frame = pd.DataFrame({'date': dates, 'additions': range(10), 'deletions': 1})
+    if commits is not None:
+        frame['commits'] = commits
+    frame['_weekday'] = pd.Categorical(dates.day_name(), categories=multi_repo_analyzer.WEEKDAY_ORDER,
+                                       ordered=True)
+    frame['_isoweek'] = dates.isocalendar().week.to_numpy()
+    return frame
+
+
+def test_heatmap_written_and_linked_only_with_commits(tmp_path):
+    """The report links the heatmap exactly when the image was written"""
+    renderer = MultiRepoAnalyzer.renderer(str(tmp_path), 'PROJ', dpi=20)
+    users = pd.DataFrame({'name': ['Dev'], 'additions': [45], 'deletions': [10], 'total_changes': [55]})
+    meta = {'start_date': '2025-06-02', 'end_date': '2025-06-11', 'group_by': 'day', 'total_additions': 45,
+            'total_deletions': 10, 'total_commits': 0, 'total_contributors': 1}
+    results = {}
+    for slug, daily in (('active', daily_frame([1] * 10)), ('idle', daily_frame([0] * 10)),
+                        ('uncounted', daily_frame())):
+        renderer._create_repository_visualizations(slug, slug, daily, users)
+        results[slug] = {'display_name': slug, 'analysis_meta': meta, 'daily_data': daily}
+
+    renderer._generate_analysis_report(results)
+    report = (tmp_path / 'analysis_report.md').read_text(encoding='utf-8')
+
+    for slug in ('active', 'idle', 'uncounted'):
+        written = (tmp_path / f'{slug}_activity_heatmap.png').exists()
+        assert written == (slug == 'active')
+        assert (f'`{slug}_activity_heatmap.png`' in report) == written
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for counting lines in plain-text diffs
+
+Uses canned diffs instead of talking to Bitbucket.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bitbucket_loc_analyzer import BitbucketLOCAnalyzer, CommitStatsCache
+
+DIFF = b"""diff --git src://app.py dst://app.py
+index 1..2 100644
+--- src://app.py
++++ dst://app.py
+@@ -1,2 +1,3 @@
+--- not a header
+-old
++++ not a header
++new
++diff --git a/x b/x
+diff --git src://logo.png dst://logo.png
+Binary files differ
+diff --git a/docs/new.md b/docs/new.md
+new file mode 100644
+--- /dev/null
++++ b/docs/new.md
+@@ -0,0 +1 @@
++hello
+\\ No newline at end of file
+diff --git a/node_modules/lib.py b/node_modules/lib.py
+--- a/node_modules/lib.py
++++ b/node_modules/lib.py
+@@ -1 +0,0 @@
+-gone
+"""
+
+
+def test_count_unified_diff(tmp_path):
+    """Hunk lines that look like headers still count; filters use the file path"""
+    analyzer = BitbucketLOCAnalyzer(base_url='https://stash.example.com', token='token')
+    analyzer.stats_cache = CommitStatsCache(str(tmp_path / 'stats'))
+
+    assert analyzer._count_unified_diff(DIFF) == (4, 3)
+    assert analyzer._count_unified_diff(DIFF, ('.py',)) == (3, 3)
+    assert analyzer._count_unified_diff(DIFF, ('.md',)) == (1, 0)
+    assert analyzer._count_unified_diff(DIFF, skip_ignored_files=True) == (4, 2)
+    assert analyzer._count_unified_diff(b'') == (0, 0)
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b''):
+        self.status_code = status_code
+        self.content = content
+
+
+def test_raw_diff_switched_off_only_when_unsupported(tmp_path):
+    """Transient errors fall back for one commit; 406/415 or JSON turn raw diffs off"""
+    analyzer = BitbucketLOCAnalyzer(base_url='https://stash.example.com', token='token')
+    analyzer.stats_cache = CommitStatsCache(str(tmp_path / 'stats'))
+    responses = []
+    analyzer.session.get = lambda url, **kwargs: responses.pop(0)
+
+    for status in (404, 429, 503):
+        responses.append(FakeResponse(status, b'error'))
+        assert analyzer._fetch_stash_raw_diff('PROJ', 'repo', 'c') is None
+        assert analyzer._stash_raw_diff
+
+    responses.append(FakeResponse(200, DIFF))
+    assert analyzer._fetch_stash_raw_diff('PROJ', 'repo', 'c') == DIFF
+
+    for response in (FakeResponse(406), FakeResponse(415), FakeResponse(200, b' {"diffs": []}')):
+        analyzer._stash_raw_diff = True
+        responses.append(response)
+        assert analyzer._fetch_stash_raw_diff('PROJ', 'repo', 'c') is None
+        assert not analyzer._stash_raw_diff